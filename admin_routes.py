@@ -2,6 +2,8 @@ from flask import Blueprint, request, jsonify, g, flash
 import sqlite3
 import random
 from datetime import datetime
+import events
+import changelog
 
 admin_bp = Blueprint('admin_bp', __name__, url_prefix='/api/admin')
 
@@ -97,7 +99,9 @@ def delete_entity(entity, id):
     column_id = id_map[entity]
     try:
         db.execute(f'DELETE FROM {entity} WHERE {column_id} = ?', (id,))
+        changelog.record_reset(db)
         db.commit()
+        events.notify()
         flash(f'{entity.capitalize()} deleted successfully!', 'success')
         return jsonify({'status': 'success', 'message': f'{entity.capitalize()} deleted successfully.'})
     except sqlite3.IntegrityError:
@@ -0,0 +1,131 @@
+import hashlib
+import json
+
+import changelog
+
+# Utilization analytics over timetable_slots. Results are computed with grouped SQL and cached in
+# analytics_cache against the change-log seq plus a fingerprint of the reference tables they read,
+# so they are rebuilt only when the timetable, rooms, teachers, classes, courses or periods change.
+# One JSON array per row, so NULL columns still count (a NULL || ... would drop the row entirely).
+REFERENCE_QUERY = '''
+    SELECT (SELECT group_concat(json_array(classroom_id, name, is_lab)) FROM classrooms),
+           (SELECT group_concat(json_array(teacher_id, name)) FROM teachers),
+           (SELECT group_concat(json_array(class_id, name, num_batches)) FROM classes),
+           (SELECT group_concat(json_array(course_id, class_id, weekly_lectures, is_lab)) FROM courses),
+           (SELECT group_concat(json_array(config_id, start_time, end_time, is_break)) FROM schedule_config)
+'''
+
+
+def init_analytics(db):
+    db.executescript('''
+        CREATE TABLE IF NOT EXISTS analytics_cache (
+            name TEXT PRIMARY KEY,
+            version TEXT NOT NULL,
+            payload TEXT NOT NULL
+        );
+    ''')
+
+
+def _slot_spans(teachable):
+    # Slots are stored with the start of their first and the end of their last teachable period.
+    start_idx = {s['start_time']: i for i, s in enumerate(teachable)}
+    end_idx = {s['end_time']: i for i, s in enumerate(teachable)}
+
+    def span(time_start, time_end):
+        first = start_idx.get(time_start)
+        if first is None:
+            return range(0)
+        last = end_idx.get(time_end, first)
+        return range(first, max(last, first) + 1)
+    return span
+
+
+def compute_utilization(db, days):
+    teachable = [dict(s) for s in db.execute('SELECT start_time, end_time FROM schedule_config WHERE is_break = 0 ORDER BY config_id')]
+    span = _slot_spans(teachable)
+    num_slots = len(teachable)
+    capacity = len(days) * num_slots
+
+    rooms = {}
+    for row in db.execute('SELECT classroom_id, name, is_lab FROM classrooms'):
+        rooms[row['classroom_id']] = {'name': row['name'], 'is_lab': row['is_lab'], 'grid': {d: [0] * num_slots for d in days}}
+    for row in db.execute('''
+        SELECT classroom_id, day, time_start, time_end, COUNT(*) AS sessions
+        FROM timetable_slots GROUP BY classroom_id, day, time_start, time_end
+    '''):
+        room = rooms.get(row['classroom_id'])
+        if room and row['day'] in room['grid']:
+            for i in span(row['time_start'], row['time_end']):
+                room['grid'][row['day']][i] += row['sessions']
+    for room in rooms.values():
+        occupied = sum(1 for d in days for count in room['grid'][d] if count)
+        room['occupied_periods'] = occupied
+        room['overbooked_periods'] = sum(1 for d in days for count in room['grid'][d] if count > 1)
+        room['utilization'] = round(occupied / capacity, 3) if capacity else 0.0
+
+    teachers = {row['teacher_id']: {'name': row['name'], 'weekly_periods': 0, 'daily_periods': {d: 0 for d in days}}
+                for row in db.execute('SELECT teacher_id, name FROM teachers')}
+    for row in db.execute('''
+        SELECT teacher_id, day, time_start, time_end, COUNT(*) AS sessions
+        FROM timetable_slots GROUP BY teacher_id, day, time_start, time_end
+    '''):
+        teacher = teachers.get(row['teacher_id'])
+        if teacher and row['day'] in teacher['daily_periods']:
+            periods = len(span(row['time_start'], row['time_end'])) * row['sessions']
+            teacher['daily_periods'][row['day']] += periods
+            teacher['weekly_periods'] += periods
+    for teacher in teachers.values():
+        teacher['max_daily_periods'] = max(teacher['daily_periods'].values(), default=0)
+
+    classes = {row['class_id']: {'name': row['name'], 'occupied': {d: set() for d in days}, 'unplaced_sessions': 0}
+               for row in db.execute('SELECT class_id, name FROM classes')}
+    for row in db.execute('SELECT DISTINCT class_id, day, time_start, time_end FROM timetable_slots'):
+        cls = classes.get(row['class_id'])
+        if cls and row['day'] in cls['occupied']:
+            cls['occupied'][row['day']].update(span(row['time_start'], row['time_end']))
+    # Theory courses need weekly_lectures sessions; practicals need one session per batch.
+    for row in db.execute('''
+        SELECT c.class_id,
+               SUM(CASE WHEN c.is_lab = 1 THEN cl.num_batches ELSE c.weekly_lectures END) AS expected,
+               SUM(IFNULL(p.placed, 0)) AS placed
+        FROM courses c
+        JOIN classes cl ON c.class_id = cl.class_id
+        LEFT JOIN (SELECT course_id, COUNT(*) AS placed FROM timetable_slots GROUP BY course_id) p ON p.course_id = c.course_id
+        GROUP BY c.class_id
+    '''):
+        if row['class_id'] in classes:
+            classes[row['class_id']]['unplaced_sessions'] = max(row['expected'] - row['placed'], 0)
+    for cls in classes.values():
+        occupied = cls.pop('occupied')
+        cls['free_periods'] = {d: num_slots - len(occupied[d]) for d in days}
+        cls['weekly_free_periods'] = sum(cls['free_periods'].values())
+
+    return {
+        'days': days,
+        'slots': teachable,
+        'rooms': rooms,
+        'teachers': teachers,
+        'classes': classes,
+        'totals': {
+            'unplaced_sessions': sum(c['unplaced_sessions'] for c in classes.values()),
+            'overbooked_room_periods': sum(r['overbooked_periods'] for r in rooms.values()),
+        },
+    }
+
+
+def cache_version(db, days):
+    reference = json.dumps([days, *db.execute(REFERENCE_QUERY).fetchone()])
+    return f'{changelog.current_seq(db)}:{hashlib.sha1(reference.encode()).hexdigest()[:16]}'
+
+
+def get_utilization(db, days, refresh=False):
+    # Returns the cached JSON text for the current timetable version, rebuilding it if stale.
+    version = cache_version(db, days)
+    if not refresh:
+        row = db.execute("SELECT version, payload FROM analytics_cache WHERE name = 'utilization'").fetchone()
+        if row and row['version'] == version:
+            return row['payload']
+    payload = json.dumps(dict(compute_utilization(db, days), version=version))
+    db.execute("INSERT OR REPLACE INTO analytics_cache (name, version, payload) VALUES ('utilization', ?, ?)", (version, payload))
+    db.commit()
+    return payload
@@ -1,4 +1,4 @@
-from flask import Flask, render_template, request, jsonify, g, redirect, url_for, flash, send_file, session
+from flask import Flask, render_template, request, jsonify, g, redirect, url_for, flash, send_file, session, Response
 import sqlite3
 from datetime import datetime, timedelta
 import random
@@ -6,8 +6,17 @@ from collections import defaultdict
 import pandas as pd
 from fpdf import FPDF
 import io
+import hashlib
 from werkzeug.security import generate_password_hash, check_password_hash
 from functools import wraps
+from concurrent.futures import ProcessPoolExecutor
+import events
+import changelog
+import variants
+import availability
+import generation_lock
+import analytics
+import compression
 
 app = Flask(__name__)
 DB_PATH = 'timetable.db'
@@ -24,6 +33,42 @@ def get_db():
         g._database = db
     return db
 
+SLOT_DETAILS_QUERY = '''
+    SELECT ts.*, t.name as teacher_name, s.name as subject_name, c.name as classroom_name, co.is_lab, co.subject_id
+    FROM timetable_slots ts
+    JOIN courses co ON ts.course_id = co.course_id
+    JOIN subjects s ON co.subject_id = s.subject_id
+    JOIN teachers t ON ts.teacher_id = t.teacher_id
+    JOIN classrooms c ON ts.classroom_id = c.classroom_id
+'''
+
+def get_slot_details(slot_id):
+    row = get_db().execute(SLOT_DETAILS_QUERY + ' WHERE ts.slot_id = ?', (slot_id,)).fetchone()
+    return dict(row) if row else None
+
+def resolve_variant(db, variant):
+    # Maps a requested variant to a saved variant name, or None for the working timetable_slots table.
+    # No variant (or 'published') means the published one, falling back to the working table.
+    if variant in (None, 'published'):
+        return variants.get_published(db)
+    return None if variant == 'current' else variant
+
+def get_class_slots(db, class_id, variant):
+    if variant is None:
+        return db.execute(SLOT_DETAILS_QUERY + ' WHERE ts.class_id = ?', (class_id,)).fetchall()
+    row = variants.get_variant(db, variant)
+    return variants.variant_slots(db, variants.decode_row_ids(row['row_ids']), class_id) if row else None
+
+def requested_variant():
+    # Anonymous readers only get the published timetable; admins default to the working table they edit.
+    # Returns False when an anonymous reader asks for anything else.
+    variant = request.args.get('variant')
+    if 'admin_id' in session:
+        return variant or 'current'
+    return variant if variant in (None, 'published') else False
+
+app.after_request(compression.compress_response)
+
 @app.teardown_appcontext
 def close_connection(exception):
     db = getattr(g, '_database', None)
@@ -37,7 +82,7 @@ def init_db():
 
         cur.execute("PRAGMA table_info(courses)")
         columns = [row['name'] for row in cur.fetchall()]
-        if 'classroom_id' not in columns:
+        if columns and 'classroom_id' not in columns:
             cur.execute("ALTER TABLE courses ADD COLUMN classroom_id INTEGER REFERENCES classrooms(classroom_id)")
 
         cur.executescript('''
@@ -122,6 +167,15 @@ def init_db():
             );
         ''')
         cur.execute("INSERT OR IGNORE INTO generation_settings (key, value) VALUES ('practical_preference', 'none')")
+        changelog.init_change_log(db)
+        variants.init_variants(db)
+        availability.init_availability(db)
+        generation_lock.init_generation_lock(db)
+        analytics.init_analytics(db)
+        cur.executescript('''
+            CREATE INDEX IF NOT EXISTS idx_courses_class ON courses (class_id, is_lab);
+            CREATE INDEX IF NOT EXISTS idx_timetable_slots_class ON timetable_slots (class_id);
+        ''')
         
         cur.execute("SELECT * FROM admins")
         if cur.fetchone() is None:
@@ -147,35 +201,61 @@ def get_slot_times():
     cur.execute('SELECT * FROM schedule_config ORDER BY config_id')
     return cur.fetchall()
 
-def generate_timetable():
+def load_generation_inputs():
     db = get_db()
     cur = db.cursor()
-    cur.execute('DELETE FROM timetable_slots')
-    db.commit()
 
-    courses = cur.execute('''
+    courses = [dict(c) for c in cur.execute('''
         SELECT c.*, s.name as subject_name, cl.name as class_name, cl.num_batches 
         FROM courses c 
         JOIN subjects s ON c.subject_id = s.subject_id
         JOIN classes cl ON c.class_id = cl.class_id
-    ''').fetchall()
+    ''').fetchall()]
     
-    theory_rooms = [r for r in cur.execute('SELECT * FROM classrooms WHERE is_lab = 0').fetchall()]
+    theory_rooms = [r['classroom_id'] for r in cur.execute('SELECT classroom_id FROM classrooms WHERE is_lab = 0').fetchall()]
+    classroom_ids = {r['classroom_id'] for r in cur.execute('SELECT classroom_id FROM classrooms').fetchall()}
     
     batch_assignments = defaultdict(dict)
     for a in cur.execute('SELECT * FROM batch_teacher_assignments').fetchall():
         batch_assignments[(a['class_id'], a['subject_id'])][a['batch_number']] = a['teacher_id']
 
-    SLOTS = get_slot_times()
-    TEACHABLE_SLOTS = [s for s in SLOTS if s['is_break'] == 0]
+    teachable_slots = [{'start_time': s['start_time'], 'end_time': s['end_time']} for s in get_slot_times() if s['is_break'] == 0]
     
     # New check for practical preference
     practical_preference = cur.execute("SELECT value FROM generation_settings WHERE key = 'practical_preference'").fetchone()['value']
-
+    hard_masks, soft_masks = availability.compile_masks(db, DAYS, len(teachable_slots))
+
+    return {
+        'courses': courses,
+        'theory_rooms': theory_rooms,
+        'classroom_ids': classroom_ids,
+        'batch_assignments': dict(batch_assignments),
+        'teachable_slots': teachable_slots,
+        'practical_preference': practical_preference,
+        'hard_masks': hard_masks,
+        'soft_masks': soft_masks,
+    }
+
+def solve_timetable(inputs, seed=None):
+    # Pure function of its inputs and seed so it can run in worker processes. Unseeded runs draw
+    # a seed and report it, so any run can be replayed.
+    if seed is None:
+        seed = random.randrange(2**31)
+    rng = random.Random(seed)
+    courses = inputs['courses']
+    theory_rooms = inputs['theory_rooms']
+    batch_assignments = inputs['batch_assignments']
+    TEACHABLE_SLOTS = inputs['teachable_slots']
+    practical_preference = inputs['practical_preference']
+    hard_masks = inputs.get('hard_masks', {})
+    soft_masks = inputs.get('soft_masks', {})
+    placements = []
+    unplaced = []
+    # Day/slot bitmask of what each teacher is already booked for.
+    teacher_busy = defaultdict(lambda: defaultdict(int))
 
     grid = {day: {slot['start_time']: {'teachers': set(), 'classrooms': set(), 'batches': defaultdict(set), 'subjects': set()} for slot in TEACHABLE_SLOTS} for day in DAYS}
 
-
     def is_block_free(day, start_idx, duration, teacher_id, classroom_id, class_id, subject_id, batch_number=None):
         if start_idx + duration > len(TEACHABLE_SLOTS):
             return False
@@ -218,7 +298,26 @@ def generate_timetable():
 
         return True
 
+    def candidate_blocks(days, possible_slots, duration, teacher_id):
+        # Prune with the teacher's masks before the full is_block_free check: hard-unavailable
+        # blocks and days the teacher already teaches are dropped, soft-unavailable blocks go last.
+        hard = hard_masks.get(teacher_id, {})
+        soft = soft_masks.get(teacher_id, {})
+        busy = teacher_busy[teacher_id]
+        candidates = []
+        for day in days:
+            if busy[day]:
+                continue
+            for slot_idx in possible_slots:
+                block = ((1 << duration) - 1) << slot_idx
+                if hard.get(day, 0) & block:
+                    continue
+                candidates.append((bool(soft.get(day, 0) & block), day, slot_idx))
+        candidates.sort(key=lambda c: c[0])
+        return [(day, slot_idx) for _, day, slot_idx in candidates]
+
     def book_block(day, start_idx, duration, teacher_id, classroom_id, class_id, subject_id, batch_number=None):
+        teacher_busy[teacher_id][day] |= ((1 << duration) - 1) << start_idx
         for i in range(duration):
             slot_time = TEACHABLE_SLOTS[start_idx + i]['start_time']
             slot = grid[day][slot_time]
@@ -247,15 +346,15 @@ def generate_timetable():
                 sessions_to_schedule.append({'type': 'lecture', 'course': course, 'duration': 1})
 
     
-    random.shuffle(sessions_to_schedule)
+    rng.shuffle(sessions_to_schedule)
 
     practicals = [s for s in sessions_to_schedule if s['type'] == 'practical']
     for session in practicals:
         course, batch, duration = session['course'], session['batch'], session['duration']
         teacher_id = batch_assignments.get((course['class_id'], course['subject_id']), {}).get(batch, course['teacher_id'])
-        lab_classroom = cur.execute('SELECT * FROM classrooms WHERE classroom_id = ?', (course['classroom_id'],)).fetchone()
+        lab_classroom_id = course['classroom_id']
 
-        if not lab_classroom: continue
+        if lab_classroom_id not in inputs['classroom_ids']: continue
         
         placed = False
         
@@ -264,22 +363,19 @@ def generate_timetable():
         if practical_preference == 'morning':
             possible_slots = [0] # Prioritize the first slot (index 0) for a 2-slot practical
         else:
-            random.shuffle(possible_slots)
+            rng.shuffle(possible_slots)
 
         
-        for day in random.sample(DAYS, len(DAYS)):
-            for slot_idx in possible_slots:
-                if is_block_free(day, slot_idx, duration, teacher_id, lab_classroom['classroom_id'], course['class_id'], course['subject_id'], batch):
-                    book_block(day, slot_idx, duration, teacher_id, lab_classroom['classroom_id'], course['class_id'], course['subject_id'], batch)
-                    start_time = TEACHABLE_SLOTS[slot_idx]['start_time']
-                    end_time = TEACHABLE_SLOTS[slot_idx + duration - 1]['end_time']
-                    cur.execute('INSERT INTO timetable_slots (class_id, day, time_start, time_end, course_id, teacher_id, classroom_id, batch_number) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
-                                (course['class_id'], day, start_time, end_time, course['course_id'], teacher_id, lab_classroom['classroom_id'], batch))
-                    placed = True
-                    break
-            if placed: break
+        for day, slot_idx in candidate_blocks(rng.sample(DAYS, len(DAYS)), possible_slots, duration, teacher_id):
+            if is_block_free(day, slot_idx, duration, teacher_id, lab_classroom_id, course['class_id'], course['subject_id'], batch):
+                book_block(day, slot_idx, duration, teacher_id, lab_classroom_id, course['class_id'], course['subject_id'], batch)
+                start_time = TEACHABLE_SLOTS[slot_idx]['start_time']
+                end_time = TEACHABLE_SLOTS[slot_idx + duration - 1]['end_time']
+                placements.append((course['class_id'], day, start_time, end_time, course['course_id'], teacher_id, lab_classroom_id, batch))
+                placed = True
+                break
         if not placed:
-            print(f"Warning: Could not schedule practical for {course['subject_name']} - Batch {batch}")
+            unplaced.append(f"Could not schedule practical for {course['subject_name']} - Batch {batch}")
 
     lectures = [s for s in sessions_to_schedule if s['type'] == 'lecture']
     for session in lectures:
@@ -288,25 +384,100 @@ def generate_timetable():
         
         placed = False
         possible_slots = list(range(len(TEACHABLE_SLOTS) - (duration - 1)))
-        random.shuffle(possible_slots)
-
-        for day in random.sample(DAYS, len(DAYS)):
-            for slot_idx in possible_slots:
-                if not theory_rooms: break
-                room = random.choice(theory_rooms)
-                if is_block_free(day, slot_idx, duration, teacher_id, room['classroom_id'], course['class_id'], course['subject_id']):
-                    book_block(day, slot_idx, duration, teacher_id, room['classroom_id'], course['class_id'], course['subject_id'])
-                    start_time = TEACHABLE_SLOTS[slot_idx]['start_time']
-                    end_time = TEACHABLE_SLOTS[slot_idx + duration - 1]['end_time']
-                    cur.execute('INSERT INTO timetable_slots (class_id, day, time_start, time_end, course_id, teacher_id, classroom_id, batch_number) VALUES (?, ?, ?, ?, ?, ?, ?, NULL)',
-                                (course['class_id'], day, start_time, end_time, course['course_id'], teacher_id, room['classroom_id']))
-                    placed = True
-                    break
-            if placed: break
+        rng.shuffle(possible_slots)
+
+        for day, slot_idx in candidate_blocks(rng.sample(DAYS, len(DAYS)), possible_slots, duration, teacher_id):
+            if not theory_rooms: break
+            room = rng.choice(theory_rooms)
+            if is_block_free(day, slot_idx, duration, teacher_id, room, course['class_id'], course['subject_id']):
+                book_block(day, slot_idx, duration, teacher_id, room, course['class_id'], course['subject_id'])
+                start_time = TEACHABLE_SLOTS[slot_idx]['start_time']
+                end_time = TEACHABLE_SLOTS[slot_idx + duration - 1]['end_time']
+                placements.append((course['class_id'], day, start_time, end_time, course['course_id'], teacher_id, room, None))
+                placed = True
+                break
         if not placed:
-            print(f"Warning: Could not schedule lecture for {course['subject_name']}")
+            unplaced.append(f"Could not schedule lecture for {course['subject_name']}")
+
+    return {'seed': seed, 'placements': placements, 'unplaced': unplaced}
+
+def run_solver(inputs, seed=None, mode='greedy', attempts=1, workers=1):
+    if mode == 'greedy':
+        return solve_timetable(inputs, seed)
+    if mode != 'best':
+        raise ValueError(f'Unknown solver mode: {mode}')
+
+    # 'best' runs independent seeded attempts and keeps the one that leaves the fewest sessions unplaced.
+    base_seed = seed if seed is not None else random.randrange(2**31)
+    seeds = [base_seed + i for i in range(max(attempts, 1))]
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(solve_timetable, [inputs] * len(seeds), seeds))
+    else:
+        results = [solve_timetable(inputs, s) for s in seeds]
+    return min(results, key=lambda r: len(r['unplaced']))
+
+def generate_timetable(seed=None, mode='greedy', attempts=1, workers=1):
+    db = get_db()
+    cur = db.cursor()
+    result = run_solver(load_generation_inputs(), seed, mode, attempts, workers)
+
+    # Keep the outgoing timetable so a bad run can be rolled back with a checkout.
+    variants.snapshot(db, 'before-generate')
+    cur.execute('DELETE FROM timetable_slots')
+    cur.executemany('INSERT INTO timetable_slots (class_id, day, time_start, time_end, course_id, teacher_id, classroom_id, batch_number) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                    result['placements'])
+    for message in result['unplaced']:
+        print(f"Warning: {message}")
 
+    changelog.record_reset(db)
     db.commit()
+    events.notify()
+    return result
+
+def generate_timetable_once(seed=None, mode='greedy', attempts=1, workers=1):
+    # Concurrent callers, in this or any other process, share one in-progress run.
+    def work():
+        result = generate_timetable(seed, mode, attempts, workers)
+        return {'seed': result['seed'], 'placed': len(result['placements']), 'unplaced': result['unplaced']}
+    return generation_lock.single_flight(DB_PATH, work)
+
+def time_to_minutes(value):
+    for fmt in ('%I:%M %p', '%H:%M'):
+        try:
+            parsed = datetime.strptime(value.strip(), fmt)
+            return parsed.hour * 60 + parsed.minute
+        except (ValueError, AttributeError):
+            continue
+    return None
+
+def validate_timetable():
+    db = get_db()
+    slots = [dict(s) for s in db.execute('SELECT * FROM timetable_slots ORDER BY day, slot_id').fetchall()]
+    for slot in slots:
+        slot['start'] = time_to_minutes(slot['time_start'])
+        slot['end'] = time_to_minutes(slot['time_end'])
+
+    by_day = defaultdict(list)
+    for slot in slots:
+        if slot['start'] is not None and slot['end'] is not None:
+            by_day[slot['day']].append(slot)
+
+    clashes = []
+    for day, day_slots in by_day.items():
+        day_slots.sort(key=lambda s: s['start'])
+        for i, a in enumerate(day_slots):
+            for b in day_slots[i + 1:]:
+                if b['start'] >= a['end']:
+                    break
+                if a['teacher_id'] == b['teacher_id']:
+                    clashes.append({'type': 'teacher', 'id': a['teacher_id'], 'day': day, 'slot_ids': [a['slot_id'], b['slot_id']]})
+                if a['classroom_id'] == b['classroom_id']:
+                    clashes.append({'type': 'classroom', 'id': a['classroom_id'], 'day': day, 'slot_ids': [a['slot_id'], b['slot_id']]})
+                # Different batches of one class may run in parallel; anything involving the whole class may not.
+                if a['class_id'] == b['class_id'] and (not a['batch_number'] or not b['batch_number'] or a['batch_number'] == b['batch_number']):
+                    clashes.append({'type': 'class', 'id': a['class_id'], 'day': day, 'slot_ids': [a['slot_id'], b['slot_id']]})
+    return clashes
 
 
 # --- ROUTES ---
@@ -434,7 +605,9 @@ def manage():
                         db.execute('INSERT INTO schedule_config (is_break, start_time, end_time, break_name) VALUES (?, ?, ?, ?)',
                                    (is_break, start_time, end_time, break_name))
                 
+                changelog.record_reset(db)
                 db.commit()
+                events.notify()
                 flash('Schedule configuration saved successfully!', 'success')
             except Exception as e:
                 db.rollback()
@@ -463,47 +636,20 @@ def manage():
                     record_id = request.form[f'{entity}_id']
                     table_name = 'classes' if entity == 'class' else f'{entity}s'
                     db.execute(f'DELETE FROM {table_name} WHERE {column_id} = ?', (record_id,))
+                    changelog.record_reset(db)
                     db.commit()
+                    events.notify()
                     flash(f'{entity.capitalize()} deleted successfully!', 'success')
                 except (sqlite3.IntegrityError, KeyError):
                     flash(f'Error: Cannot delete {entity} because it is in use by another record.', 'error')
             return redirect(url_for('manage'))
 
-    warnings = []
-    classes_list = cur.execute('SELECT * FROM classes').fetchall()
-    all_courses = cur.execute('SELECT * FROM courses WHERE is_lab = 1').fetchall()
-
-    for class_obj in classes_list:
-        num_batches = class_obj['num_batches']
-        if num_batches > 1:
-            class_practicals = [c for c in all_courses if c['class_id'] == class_obj['class_id']]
-            
-            if len(class_practicals) < num_batches:
-                 warnings.append(
-                    f"For class '{class_obj['name']}', the number of batches ({num_batches}) is greater than "
-                    f"the number of assigned practical courses ({len(class_practicals)}). Some batches may miss practicals."
-                )
-
-    teachers = cur.execute('SELECT teachers.*, teacher_preferences.preference FROM teachers LEFT JOIN teacher_preferences ON teachers.teacher_id = teacher_preferences.teacher_id').fetchall()
-    subjects = cur.execute('SELECT * FROM subjects').fetchall()
-    classrooms = cur.execute('SELECT * FROM classrooms').fetchall()
-    courses = cur.execute('''
-        SELECT c.*, t.name as teacher_name, sub.name as subject_name, cl.name as class_name, cl.num_batches
-        FROM courses c 
-        JOIN teachers t ON c.teacher_id = t.teacher_id 
-        JOIN subjects sub ON c.subject_id = sub.subject_id
-        JOIN classes cl ON c.class_id = cl.class_id
-    ''').fetchall()
-    
-    batch_assignments = defaultdict(lambda: defaultdict(dict))
-    assignments = cur.execute('''
-        SELECT b.*, t.name as teacher_name 
-        FROM batch_teacher_assignments b 
-        JOIN teachers t ON b.teacher_id = t.teacher_id
-    ''').fetchall()
-    for a in assignments:
-        batch_assignments[a['class_id']][a['subject_id']][a['batch_number']] = a['teacher_id']
-
+    # Only the option lists for the add forms are rendered here; the data tables are loaded
+    # page by page from /api/manage/<section> by manage.js.
+    warnings = get_batch_warnings()
+    teachers = cur.execute('SELECT teacher_id, name FROM teachers ORDER BY teacher_id').fetchall()
+    subjects = cur.execute('SELECT subject_id, name, code FROM subjects ORDER BY subject_id').fetchall()
+    classes_list = cur.execute('SELECT * FROM classes ORDER BY class_id').fetchall()
     schedule_config = get_slot_times()
     practical_preference = cur.execute("SELECT value FROM generation_settings WHERE key = 'practical_preference'").fetchone()['value']
     lab_classrooms = cur.execute('SELECT * FROM classrooms WHERE is_lab = 1').fetchall()
@@ -512,14 +658,112 @@ def manage():
                            teachers=teachers, 
                            subjects=subjects, 
                            classes=classes_list, 
-                           classrooms=classrooms, 
-                           courses=courses, 
                            schedule_config=schedule_config,
                            warnings=warnings,
-                           batch_assignments=batch_assignments,
                            practical_preference=practical_preference,
                            lab_classrooms=lab_classrooms)
 
+def get_batch_warnings():
+    rows = get_db().execute('''
+        SELECT cl.name, cl.num_batches, COUNT(c.course_id) AS practical_count
+        FROM classes cl
+        LEFT JOIN courses c ON c.class_id = cl.class_id AND c.is_lab = 1
+        WHERE cl.num_batches > 1
+        GROUP BY cl.class_id
+        HAVING COUNT(c.course_id) < cl.num_batches
+    ''').fetchall()
+    return [
+        f"For class '{row['name']}', the number of batches ({row['num_batches']}) is greater than "
+        f"the number of assigned practical courses ({row['practical_count']}). Some batches may miss practicals."
+        for row in rows
+    ]
+
+# Keyset-paginated listings for the manage page: each section is ordered by its primary key.
+MANAGE_SECTIONS = {
+    'teachers': {
+        'query': 'SELECT t.teacher_id, t.name, p.preference FROM teachers t LEFT JOIN teacher_preferences p ON t.teacher_id = p.teacher_id',
+        'key': 't.teacher_id',
+        'search': ['t.name'],
+        'filters': {},
+    },
+    'subjects': {
+        'query': 'SELECT s.subject_id, s.name, s.code FROM subjects s',
+        'key': 's.subject_id',
+        'search': ['s.name', 's.code'],
+        'filters': {},
+    },
+    'classes': {
+        'query': 'SELECT cl.class_id, cl.name, cl.num_batches FROM classes cl',
+        'key': 'cl.class_id',
+        'search': ['cl.name'],
+        'filters': {},
+    },
+    'classrooms': {
+        'query': 'SELECT r.classroom_id, r.name, r.is_lab FROM classrooms r',
+        'key': 'r.classroom_id',
+        'search': ['r.name'],
+        'filters': {'is_lab': 'r.is_lab'},
+    },
+    'courses': {
+        'query': '''
+            SELECT c.*, t.name as teacher_name, sub.name as subject_name, cl.name as class_name, cl.num_batches
+            FROM courses c 
+            JOIN teachers t ON c.teacher_id = t.teacher_id 
+            JOIN subjects sub ON c.subject_id = sub.subject_id
+            JOIN classes cl ON c.class_id = cl.class_id
+        ''',
+        'key': 'c.course_id',
+        'search': ['t.name', 'sub.name', 'cl.name'],
+        'filters': {'class_id': 'c.class_id', 'subject_id': 'c.subject_id', 'teacher_id': 'c.teacher_id', 'is_lab': 'c.is_lab'},
+    },
+    'batch_assignments': {
+        'query': '''
+            SELECT b.*, t.name as teacher_name 
+            FROM batch_teacher_assignments b 
+            JOIN teachers t ON b.teacher_id = t.teacher_id
+        ''',
+        'key': 'b.assignment_id',
+        'search': ['t.name'],
+        'filters': {'class_id': 'b.class_id', 'subject_id': 'b.subject_id'},
+    },
+}
+MANAGE_PAGE_SIZE = 50
+MANAGE_MAX_PAGE_SIZE = 500
+
+@app.route('/api/manage/<section>')
+@login_required
+def api_manage_list(section):
+    config = MANAGE_SECTIONS.get(section)
+    if not config:
+        return jsonify({'status': 'error', 'message': 'Invalid section'}), 404
+
+    after = request.args.get('after', 0, type=int)
+    limit = min(max(request.args.get('limit', MANAGE_PAGE_SIZE, type=int), 1), MANAGE_MAX_PAGE_SIZE)
+    clauses = [f"{config['key']} > ?"]
+    params = [after]
+    for arg, column in config['filters'].items():
+        value = request.args.get(arg, type=int)
+        if value is not None:
+            clauses.append(f'{column} = ?')
+            params.append(value)
+    q = request.args.get('q', '').strip()
+    if q:
+        clauses.append('(' + ' OR '.join(f'{column} LIKE ?' for column in config['search']) + ')')
+        params.extend([f'%{q}%'] * len(config['search']))
+
+    sql = f"{config['query']} WHERE {' AND '.join(clauses)} ORDER BY {config['key']} LIMIT ?"
+    rows = [dict(row) for row in get_db().execute(sql, params + [limit + 1]).fetchall()]
+    # One extra row tells us whether another page exists without a COUNT(*).
+    has_more = len(rows) > limit
+    items = rows[:limit]
+    key_name = config['key'].split('.')[-1]
+    return jsonify({'items': items, 'next_after': items[-1][key_name] if has_more else None})
+
+@app.route('/api/manage/warnings')
+@login_required
+def api_manage_warnings():
+    return jsonify({'warnings': get_batch_warnings()})
+
 @app.route('/')
 def index():
     db = get_db()
@@ -559,8 +803,14 @@ def admin_logout():
 @app.route('/api/timetable/generate', methods=['POST'])
 @login_required
 def api_generate():
-    generate_timetable()
-    return jsonify({'status': 'success', 'message': 'Timetable generated successfully!'})
+    try:
+        summary, joined = generate_timetable_once()
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': f'Timetable generation failed: {e}'}), 500
+    message = 'Timetable generated successfully!'
+    if joined:
+        message = 'A generation was already in progress; its timetable is now ready.'
+    return jsonify({'status': 'success', 'message': message, 'joined': joined, **summary})
 
 @app.route('/api/timetables/<class_name>')
 def api_get_timetable(class_name):
@@ -571,21 +821,40 @@ def api_get_timetable(class_name):
     if not class_id_row:
         return jsonify({'error': 'Class not found'}), 404
     class_id = class_id_row['class_id']
-    
+
+    variant = requested_variant()
+    if variant is False:
+        return jsonify({'error': 'Only the published timetable is public'}), 403
+    variant = resolve_variant(db, variant)
+    # seq and ?since= deltas track the working table; saved variants never change.
+    seq = changelog.current_seq(db) if variant is None else None
+    since = request.args.get('since', type=int)
+    if variant is None and since is not None:
+        changed = changelog.changes_since(db, since, class_id)
+        if changed is not None:
+            details = {}
+            if changed:
+                placeholders = ','.join('?' * len(changed))
+                for row in cur.execute(SLOT_DETAILS_QUERY + f' WHERE ts.slot_id IN ({placeholders})', list(changed)).fetchall():
+                    details[row['slot_id']] = dict(row)
+            changes = []
+            for slot_id, (change_seq, _) in sorted(changed.items(), key=lambda item: item[1][0]):
+                if slot_id in details:
+                    changes.append({'seq': change_seq, 'op': 'upsert', 'slot_id': slot_id, 'slot': details[slot_id]})
+                else:
+                    changes.append({'seq': change_seq, 'op': 'delete', 'slot_id': slot_id})
+            return jsonify({'full': False, 'seq': seq, 'changes': changes})
+
     SLOTS = get_slot_times()
     TEACHABLE_SLOTS = [s for s in SLOTS if s['is_break'] == 0]
     grid = {day: {slot['start_time']: [] for slot in TEACHABLE_SLOTS} for day in DAYS}
-    
-    slots_query = '''
-        SELECT ts.*, t.name as teacher_name, s.name as subject_name, c.name as classroom_name, co.is_lab
-        FROM timetable_slots ts
-        JOIN courses co ON ts.course_id = co.course_id
-        JOIN subjects s ON co.subject_id = s.subject_id
-        JOIN teachers t ON ts.teacher_id = t.teacher_id
-        JOIN classrooms c ON ts.classroom_id = c.classroom_id
-        WHERE ts.class_id = ?
-    '''
-    db_slots = cur.execute(slots_query, (class_id,)).fetchall()
+
+    db_slots = get_class_slots(db, class_id, variant)
+    if db_slots is None:
+        return jsonify({'error': 'Variant not found'}), 404
+
+    if request.args.get('format') == 'compact':
+        return jsonify(build_compact_timetable(db_slots, SLOTS, TEACHABLE_SLOTS, seq, variant))
 
     for day in DAYS:
         for teachable_slot in TEACHABLE_SLOTS:
@@ -606,12 +875,89 @@ def api_get_timetable(class_name):
     classrooms = [dict(row) for row in cur.fetchall()]
     
     return jsonify({
+        'full': True,
+        'seq': seq,
+        'variant': variant,
         'grid': grid, 
         'days': DAYS, 
         'slots_full': [dict(s) for s in SLOTS],
         'options': {'teachers': teachers, 'subjects': subjects, 'classrooms': classrooms}
     })
 
+def build_compact_timetable(db_slots, slots_full, teachable_slots, seq, variant):
+    # Column-oriented layout: one entry per session (not per covered cell), with ids that resolve
+    # through /api/timetable/dictionary and positions given as day/teachable-slot indexes.
+    day_index = {day: i for i, day in enumerate(DAYS)}
+    cells = {name: [] for name in ('slot_id', 'day', 'start', 'span', 'subject_id', 'teacher_id', 'classroom_id', 'batch_number', 'is_lab')}
+    # Times are 12-hour strings, so overlap is checked in minutes; unparseable times fall back to
+    # an exact match on the period start.
+    periods = [(time_to_minutes(t['start_time']), time_to_minutes(t['end_time'])) for t in teachable_slots]
+    for db_slot in db_slots:
+        start, end = time_to_minutes(db_slot['time_start']), time_to_minutes(db_slot['time_end'])
+        if start is None or end is None:
+            covered = [i for i, t in enumerate(teachable_slots) if t['start_time'] == db_slot['time_start']]
+        else:
+            covered = [i for i, (p_start, p_end) in enumerate(periods)
+                       if p_start is not None and p_end is not None and p_start < end and p_end > start]
+        if db_slot['day'] not in day_index or not covered:
+            continue
+        cells['slot_id'].append(db_slot['slot_id'])
+        cells['day'].append(day_index[db_slot['day']])
+        cells['start'].append(covered[0])
+        cells['span'].append(len(covered))
+        cells['subject_id'].append(db_slot['subject_id'])
+        cells['teacher_id'].append(db_slot['teacher_id'])
+        cells['classroom_id'].append(db_slot['classroom_id'])
+        cells['batch_number'].append(db_slot['batch_number'])
+        cells['is_lab'].append(db_slot['is_lab'])
+
+    return {
+        'format': 'compact',
+        'full': True,
+        'seq': seq,
+        'variant': variant,
+        'days': DAYS,
+        'slots': {
+            'start_time': [s['start_time'] for s in slots_full],
+            'end_time': [s['end_time'] for s in slots_full],
+            'is_break': [s['is_break'] for s in slots_full],
+            'break_name': [s['break_name'] for s in slots_full],
+        },
+        'cells': cells,
+    }
+
+@app.route('/api/timetable/dictionary')
+def api_timetable_dictionary():
+    # Reference data shared by every class; revalidated cheaply through its ETag.
+    db = get_db()
+    payload = {
+        'teachers': [[r['teacher_id'], r['name']] for r in db.execute('SELECT teacher_id, name FROM teachers ORDER BY teacher_id')],
+        'subjects': [[r['subject_id'], r['name']] for r in db.execute('SELECT subject_id, name FROM subjects ORDER BY subject_id')],
+        'classrooms': [[r['classroom_id'], r['name']] for r in db.execute('SELECT classroom_id, name FROM classrooms ORDER BY classroom_id')],
+    }
+    response = jsonify(payload)
+    response.set_etag(hashlib.sha1(response.get_data()).hexdigest(), weak=True)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response.make_conditional(request)
+
+@app.route('/api/timetable/stream')
+def api_timetable_stream():
+    db = get_db()
+    # Live updates describe the working table, which is private once a variant is published.
+    if 'admin_id' not in session and variants.get_published(db):
+        return jsonify({'error': 'Only the published timetable is public'}), 403
+    class_id = None
+    class_name = request.args.get('class')
+    if class_name:
+        row = db.execute('SELECT class_id FROM classes WHERE name = ?', (class_name,)).fetchone()
+        if not row:
+            return jsonify({'error': 'Class not found'}), 404
+        class_id = row['class_id']
+    # EventSource sends Last-Event-ID when it reconnects; ?since= lets a fresh page resume from its fetch.
+    since = request.headers.get('Last-Event-ID', request.args.get('since'))
+    since = int(since) if since and since.isdigit() else None
+    return Response(events.stream(DB_PATH, class_id, since, SLOT_DETAILS_QUERY), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
 
 @app.route('/api/timetable/update', methods=['POST'])
 @login_required
@@ -637,13 +983,20 @@ def api_update():
                 SET day = ?, time_start = ?, time_end = ?, teacher_id = ?, classroom_id = ?, course_id = ?
                 WHERE slot_id = ?
             ''', (data['day'], data['time_start'], data['time_end'], data['teacher_id'], data['classroom_id'], course_id, slot_id))
+            op = 'update'
         else:
             cur.execute('''
                 INSERT INTO timetable_slots (class_id, day, time_start, time_end, teacher_id, classroom_id, course_id)
                 VALUES (?, ?, ?, ?, ?, ?, ?)
             ''', (data['class_id'], data['day'], data['time_start'], data['time_end'], data['teacher_id'], data['classroom_id'], course_id))
+            slot_id = cur.lastrowid
+            op = 'insert'
+        class_row = cur.execute('SELECT class_id FROM timetable_slots WHERE slot_id = ?', (slot_id,)).fetchone()
+        changelog.record_change(db, op, class_row['class_id'] if class_row else None, slot_id)
         db.commit()
-        return jsonify({'status': 'success', 'message': 'Timetable updated successfully.'})
+        events.notify()
+        slot = get_slot_details(slot_id)
+        return jsonify({'status': 'success', 'message': 'Timetable updated successfully.', 'slot': slot})
     except Exception as e:
         db.rollback()
         return jsonify({'status': 'error', 'message': str(e)}), 500
@@ -659,15 +1012,121 @@ def api_delete():
 
     db = get_db()
     try:
+        row = db.execute('SELECT class_id FROM timetable_slots WHERE slot_id = ?', (slot_id,)).fetchone()
         db.execute('DELETE FROM timetable_slots WHERE slot_id = ?', (slot_id,))
+        if row:
+            changelog.record_change(db, 'delete', row['class_id'], slot_id)
         db.commit()
+        events.notify()
         return jsonify({'status': 'success', 'message': 'Slot cleared successfully.'})
     except Exception as e:
         db.rollback()
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
 
-def get_timetable_data_for_export(class_name):
+@app.route('/api/teachers/<int:teacher_id>/availability', methods=['GET', 'PUT'])
+@login_required
+def api_teacher_availability(teacher_id):
+    db = get_db()
+    if not db.execute('SELECT 1 FROM teachers WHERE teacher_id = ?', (teacher_id,)).fetchone():
+        return jsonify({'status': 'error', 'message': 'Teacher not found.'}), 404
+    if request.method == 'PUT':
+        body = request.get_json(silent=True)
+        if not isinstance(body, dict):
+            return jsonify({'status': 'error', 'message': 'Expected a JSON object with a rules list.'}), 400
+        try:
+            num_slots = sum(1 for s in get_slot_times() if s['is_break'] == 0)
+            rules = availability.parse_rules(body.get('rules', []), DAYS, num_slots)
+        except ValueError as e:
+            return jsonify({'status': 'error', 'message': str(e)}), 400
+        availability.set_rules(db, teacher_id, rules)
+        db.commit()
+        return jsonify({'status': 'success', 'message': 'Availability saved.', 'rules': rules})
+    return jsonify({'rules': availability.get_rules(db, teacher_id)})
+
+@app.route('/api/analytics/utilization')
+@login_required
+def api_utilization():
+    payload = analytics.get_utilization(get_db(), DAYS, refresh=request.args.get('refresh') == '1')
+    return Response(payload, mimetype='application/json')
+
+@app.route('/api/variants', methods=['GET', 'POST'])
+@login_required
+def api_variants():
+    db = get_db()
+    if request.method == 'POST':
+        name = (request.json or {}).get('name', '').strip()
+        if not name or name in ('current', 'published', 'diff'):
+            return jsonify({'status': 'error', 'message': 'A variant name is required.'}), 400
+        count = variants.snapshot(db, name)
+        db.commit()
+        return jsonify({'status': 'success', 'message': f'Saved {count} slots as variant "{name}".'})
+    return jsonify({'variants': variants.list_variants(db), 'published': variants.get_published(db)})
+
+@app.route('/api/variants/<name>', methods=['DELETE'])
+@login_required
+def api_delete_variant(name):
+    db = get_db()
+    if not variants.get_variant(db, name):
+        return jsonify({'status': 'error', 'message': 'Variant not found.'}), 404
+    variants.delete_variant(db, name)
+    db.commit()
+    return jsonify({'status': 'success', 'message': f'Variant "{name}" deleted.'})
+
+@app.route('/api/variants/<name>/publish', methods=['POST'])
+@login_required
+def api_publish_variant(name):
+    db = get_db()
+    if not variants.get_variant(db, name):
+        return jsonify({'status': 'error', 'message': 'Variant not found.'}), 404
+    variants.publish(db, name)
+    changelog.record_reset(db)
+    db.commit()
+    events.notify()
+    return jsonify({'status': 'success', 'message': f'Variant "{name}" published.'})
+
+@app.route('/api/variants/<name>/checkout', methods=['POST'])
+@login_required
+def api_checkout_variant(name):
+    db = get_db()
+    # The replaced working table is kept as 'before-checkout', so a checkout can be undone.
+    count = variants.checkout(db, name, backup='before-checkout')
+    if count is None:
+        db.rollback()
+        return jsonify({'status': 'error', 'message': 'Variant not found.'}), 404
+    changelog.record_reset(db)
+    db.commit()
+    events.notify()
+    return jsonify({'status': 'success', 'message': f'Loaded {count} slots from variant "{name}".'})
+
+@app.route('/api/variants/diff')
+@login_required
+def api_diff_variants():
+    db = get_db()
+    from_name, to_name = request.args.get('from', 'published'), request.args.get('to', 'current')
+    if 'published' in (from_name, to_name) and not variants.get_published(db):
+        return jsonify({'status': 'error', 'message': 'No variant is published; pass ?from=<variant> to compare against a saved one.'}), 400
+    from_ids = variants.resolve_row_ids(db, from_name)
+    to_ids = variants.resolve_row_ids(db, to_name)
+    if from_ids is None or to_ids is None:
+        return jsonify({'status': 'error', 'message': 'Variant not found.'}), 404
+    result = variants.diff(db, from_ids, to_ids)
+    # Interning 'current' is only needed for the comparison, so its pool rows are not kept.
+    db.rollback()
+    return jsonify(result)
+
+
+def export_variant():
+    # Returns (variant, error response) for the export routes.
+    variant = requested_variant()
+    if variant is False:
+        return None, ("Only the published timetable is public", 403)
+    name = resolve_variant(get_db(), variant)
+    if name is not None and not variants.get_variant(get_db(), name):
+        return None, ("Variant not found", 404)
+    return variant, None
+
+def get_timetable_data_for_export(class_name, variant=None):
     db = get_db()
     cur = db.cursor()
     cur.execute('SELECT class_id FROM classes WHERE name = ?', (class_name,))
@@ -680,17 +1139,9 @@ def get_timetable_data_for_export(class_name):
     teachable_slots = [s for s in slots_full if s['is_break'] == 0]
     grid = {day: {slot['start_time']: [] for slot in teachable_slots} for day in DAYS}
 
-    slots_query = '''
-        SELECT ts.*, t.name as teacher_name, s.name as subject_name, c.name as classroom_name, co.is_lab
-        FROM timetable_slots ts
-        JOIN courses co ON ts.course_id = co.course_id
-        JOIN subjects s ON co.subject_id = s.subject_id
-        JOIN teachers t ON ts.teacher_id = t.teacher_id
-        JOIN classrooms c ON ts.classroom_id = c.classroom_id
-        WHERE ts.class_id = ?
-    '''
-    cur.execute(slots_query, (class_id,))
-    slots = cur.fetchall()
+    slots = get_class_slots(db, class_id, resolve_variant(db, variant))
+    if slots is None:
+        return None, None
 
     for slot in slots:
         start_time = slot['time_start']
@@ -700,11 +1151,10 @@ def get_timetable_data_for_export(class_name):
     
     return grid, slots_full
 
-@app.route('/api/export/pdf/<class_name>')
-def export_timetable_pdf(class_name):
-    grid, slots_full = get_timetable_data_for_export(class_name)
+def build_timetable_pdf(class_name, variant=None):
+    grid, slots_full = get_timetable_data_for_export(class_name, variant)
     if grid is None:
-        return "Class not found", 404
+        return None
     
     pdf = FPDF(orientation='L', unit='mm', format='A4')
     pdf.add_page()
@@ -739,16 +1189,12 @@ def export_timetable_pdf(class_name):
                 pdf.set_y(y_before)
             pdf.set_y(y_before + 15)
 
-    pdf_bytes = pdf.output(dest='S').encode('latin-1')
-    buffer = io.BytesIO(pdf_bytes)
-    buffer.seek(0)
-    return send_file(buffer, as_attachment=True, download_name=f'{class_name}_timetable.pdf', mimetype='application/pdf')
+    return pdf.output(dest='S').encode('latin-1')
 
-@app.route('/api/export/excel/<class_name>')
-def export_timetable_excel(class_name):
-    grid, slots_full = get_timetable_data_for_export(class_name)
+def build_timetable_excel(class_name, variant=None):
+    grid, slots_full = get_timetable_data_for_export(class_name, variant)
     if grid is None:
-        return "Class not found", 404
+        return None
 
     df_data = {'Time': [f"{s['start_time']} - {s['end_time']}" for s in slots_full]}
     for day in DAYS:
@@ -772,6 +1218,31 @@ def export_timetable_excel(class_name):
             max_len = max((series.astype(str).map(len).max(), len(str(series.name)))) + 2
             worksheet.set_column(idx, idx, max_len)
  
+    return output.getvalue()
+
+@app.route('/api/export/pdf/<class_name>')
+def export_timetable_pdf(class_name):
+    variant, error = export_variant()
+    if error:
+        return error
+    pdf_bytes = build_timetable_pdf(class_name, variant)
+    if pdf_bytes is None:
+        return "Class not found", 404
+
+    buffer = io.BytesIO(pdf_bytes)
+    buffer.seek(0)
+    return send_file(buffer, as_attachment=True, download_name=f'{class_name}_timetable.pdf', mimetype='application/pdf')
+
+@app.route('/api/export/excel/<class_name>')
+def export_timetable_excel(class_name):
+    variant, error = export_variant()
+    if error:
+        return error
+    excel_bytes = build_timetable_excel(class_name, variant)
+    if excel_bytes is None:
+        return "Class not found", 404
+
+    output = io.BytesIO(excel_bytes)
     output.seek(0)
     
     return send_file(output, as_attachment=True, download_name=f'{class_name}_timetable.xlsx', mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
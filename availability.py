@@ -0,0 +1,91 @@
+from collections import defaultdict
+
+# Teacher unavailability windows compiled into per-teacher, per-day bitmasks over teachable slot
+# indices (bit i set = slot i blocked). 'hard' windows are never booked; 'soft' ones are tried last.
+KINDS = ('hard', 'soft')
+
+
+def init_availability(db):
+    db.executescript('''
+        CREATE TABLE IF NOT EXISTS teacher_availability (
+            availability_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            teacher_id INTEGER NOT NULL,
+            day TEXT,
+            slot_from INTEGER NOT NULL,
+            slot_to INTEGER NOT NULL,
+            kind TEXT NOT NULL DEFAULT 'hard',
+            FOREIGN KEY (teacher_id) REFERENCES teachers(teacher_id)
+        );
+        CREATE INDEX IF NOT EXISTS idx_teacher_availability_teacher ON teacher_availability (teacher_id);
+    ''')
+
+
+def get_rules(db, teacher_id):
+    rows = db.execute('SELECT day, slot_from, slot_to, kind FROM teacher_availability WHERE teacher_id = ? ORDER BY availability_id',
+                      (teacher_id,)).fetchall()
+    return [dict(row) for row in rows]
+
+
+def parse_rules(raw_rules, days, num_slots):
+    if not isinstance(raw_rules, list):
+        raise ValueError('rules must be a list.')
+    rules = []
+    for raw in raw_rules:
+        if not isinstance(raw, dict):
+            raise ValueError('Each rule must be an object.')
+        day = raw.get('day') or None
+        kind = raw.get('kind', 'hard')
+        try:
+            slot_from, slot_to = int(raw['slot_from']), int(raw['slot_to'])
+        except (KeyError, TypeError, ValueError):
+            raise ValueError('Each rule needs integer slot_from and slot_to.')
+        if day is not None and day not in days:
+            raise ValueError(f'Unknown day: {day}')
+        if kind not in KINDS:
+            raise ValueError(f'Unknown kind: {kind}')
+        if slot_from < 0 or slot_to < slot_from:
+            raise ValueError('slot_from must be >= 0 and <= slot_to.')
+        if slot_to >= num_slots:
+            raise ValueError(f'slot_to must be below the number of teachable slots ({num_slots}).')
+        rules.append({'day': day, 'slot_from': slot_from, 'slot_to': slot_to, 'kind': kind})
+    return rules
+
+
+def set_rules(db, teacher_id, rules):
+    db.execute('DELETE FROM teacher_availability WHERE teacher_id = ?', (teacher_id,))
+    db.executemany('INSERT INTO teacher_availability (teacher_id, day, slot_from, slot_to, kind) VALUES (?, ?, ?, ?, ?)',
+                   [(teacher_id, r['day'], r['slot_from'], r['slot_to'], r['kind']) for r in rules])
+
+
+def range_mask(slot_from, slot_to):
+    return ((1 << (slot_to - slot_from + 1)) - 1) << slot_from
+
+
+def compile_masks(db, days, num_slots):
+    hard = defaultdict(lambda: defaultdict(int))
+    soft = defaultdict(lambda: defaultdict(int))
+    full = (1 << num_slots) - 1
+
+    for row in db.execute('SELECT teacher_id, day, slot_from, slot_to, kind FROM teacher_availability').fetchall():
+        # Rules saved before the schedule shrank may reach past the last slot.
+        slot_to = min(row['slot_to'], num_slots - 1)
+        if row['slot_from'] > slot_to:
+            continue
+        mask = range_mask(row['slot_from'], slot_to)
+        target = hard if row['kind'] == 'hard' else soft
+        for day in ([row['day']] if row['day'] else days):
+            target[row['teacher_id']][day] |= mask
+
+    # The legacy morning/afternoon preference becomes a soft block on the other half of the day.
+    half = num_slots // 2
+    for row in db.execute('SELECT teacher_id, preference FROM teacher_preferences').fetchall():
+        if row['preference'] == 'morning':
+            mask = full & ~range_mask(0, half - 1) if half else 0
+        elif row['preference'] == 'afternoon':
+            mask = range_mask(0, half - 1) if half else 0
+        else:
+            continue
+        for day in days:
+            soft[row['teacher_id']][day] |= mask
+
+    return {tid: dict(by_day) for tid, by_day in hard.items()}, {tid: dict(by_day) for tid, by_day in soft.items()}
@@ -0,0 +1,68 @@
+# Slot-level change log backing the `?since=<seq>` delta sync mode of the timetable API and the
+# live update stream.
+CHANGE_LOG_LIMIT = 5000
+
+
+def init_change_log(db):
+    db.executescript('''
+        CREATE TABLE IF NOT EXISTS timetable_changes (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            class_id INTEGER,
+            slot_id INTEGER,
+            op TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_timetable_changes_class ON timetable_changes (class_id, seq);
+    ''')
+    db.execute("INSERT OR IGNORE INTO generation_settings (key, value) VALUES ('change_log_floor', '0')")
+
+
+def current_seq(db):
+    row = db.execute('SELECT MAX(seq) AS seq FROM timetable_changes').fetchone()
+    return row['seq'] or 0
+
+
+def get_floor(db):
+    row = db.execute("SELECT value FROM generation_settings WHERE key = 'change_log_floor'").fetchone()
+    return int(row['value']) if row else 0
+
+
+def _set_floor(db, seq):
+    db.execute("INSERT OR REPLACE INTO generation_settings (key, value) VALUES ('change_log_floor', ?)", (str(seq),))
+
+
+def record_change(db, op, class_id, slot_id):
+    # Runs inside the caller's transaction so the log and timetable_slots commit together.
+    cur = db.execute('INSERT INTO timetable_changes (class_id, slot_id, op) VALUES (?, ?, ?)', (class_id, slot_id, op))
+    seq = cur.lastrowid
+    if seq % 500 == 0:
+        compact(db)
+    return seq
+
+
+def record_reset(db):
+    # The whole timetable changed: older entries are useless, so clients behind this point get a full snapshot.
+    db.execute('DELETE FROM timetable_changes')
+    seq = db.execute("INSERT INTO timetable_changes (class_id, slot_id, op) VALUES (NULL, NULL, 'reset')").lastrowid
+    _set_floor(db, seq)
+    return seq
+
+
+def compact(db, keep=CHANGE_LOG_LIMIT):
+    cutoff = current_seq(db) - keep
+    if cutoff > get_floor(db):
+        db.execute('DELETE FROM timetable_changes WHERE seq <= ?', (cutoff,))
+        _set_floor(db, cutoff)
+
+
+def changes_since(db, since, class_id=None):
+    # Returns {slot_id: (last seq, class_id)} for slots of the class (or of every class when class_id
+    # is None) touched after `since`, or None when the log no longer reaches back that far.
+    # class_id comes from the latest entry, which SQLite picks for bare columns alongside MAX().
+    if since < get_floor(db):
+        return None
+    rows = db.execute('''
+        SELECT slot_id, MAX(seq) AS seq, class_id FROM timetable_changes
+        WHERE seq > ? AND (? IS NULL OR class_id = ?) AND slot_id IS NOT NULL
+        GROUP BY slot_id
+    ''', (since, class_id, class_id)).fetchall()
+    return {row['slot_id']: (row['seq'], row['class_id']) for row in rows}
@@ -0,0 +1,86 @@
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import click
+
+import app as timetable_app
+
+EXPORT_BUILDERS = {
+    'pdf': timetable_app.build_timetable_pdf,
+    'xlsx': timetable_app.build_timetable_excel,
+}
+
+
+def _export_class(db_path, class_name, fmt, out_dir):
+    # Runs in a worker process, so it opens its own app context and connection.
+    timetable_app.DB_PATH = db_path
+    with timetable_app.app.app_context():
+        data = EXPORT_BUILDERS[fmt](class_name)
+    if data is None:
+        return class_name, None
+    path = os.path.join(out_dir, f'{class_name}_timetable.{fmt}')
+    with open(path, 'wb') as f:
+        f.write(data)
+    return class_name, path
+
+
+@click.group()
+@click.option('--db', 'db_path', default=timetable_app.DB_PATH, show_default=True, help='Path to the SQLite database.')
+@click.pass_context
+def cli(ctx, db_path):
+    """Headless timetable generation, validation and export."""
+    timetable_app.DB_PATH = db_path
+    timetable_app.init_db()
+    ctx.obj = {'db_path': db_path}
+
+
+@cli.command()
+@click.option('--seed', type=int, default=None, help='Seed for a reproducible run.')
+@click.option('--mode', type=click.Choice(['greedy', 'best']), default='greedy', show_default=True,
+              help="'greedy' makes a single pass; 'best' keeps the attempt with the fewest unplaced sessions.")
+@click.option('--attempts', type=int, default=1, show_default=True, help='Number of attempts in best mode.')
+@click.option('--workers', type=int, default=1, show_default=True, help='Worker processes for best mode.')
+def generate(seed, mode, attempts, workers):
+    """Generate a new timetable, replacing the current one."""
+    with timetable_app.app.app_context():
+        summary, joined = timetable_app.generate_timetable_once(seed=seed, mode=mode, attempts=attempts, workers=workers)
+    if joined:
+        click.echo('Joined a generation already in progress.')
+    click.echo(f"Placed {summary['placed']} sessions, {len(summary['unplaced'])} unplaced (seed {summary['seed']}).")
+
+
+@cli.command()
+def validate():
+    """Check the stored timetable for teacher, room and class clashes."""
+    with timetable_app.app.app_context():
+        clashes = timetable_app.validate_timetable()
+    for clash in clashes:
+        click.echo(f"{clash['day']}: {clash['type']} {clash['id']} double-booked in slots {clash['slot_ids'][0]} and {clash['slot_ids'][1]}")
+    if clashes:
+        click.echo(f'{len(clashes)} clash(es) found.')
+        sys.exit(1)
+    click.echo('No clashes found.')
+
+
+@cli.command()
+@click.option('--format', 'fmt', type=click.Choice(sorted(EXPORT_BUILDERS)), default='pdf', show_default=True)
+@click.option('--out', 'out_dir', type=click.Path(file_okay=False), default='exports', show_default=True)
+@click.option('--workers', type=int, default=os.cpu_count() or 1, show_default=True)
+@click.pass_context
+def export(ctx, fmt, out_dir, workers):
+    """Export every class timetable to PDF or XLSX."""
+    os.makedirs(out_dir, exist_ok=True)
+    with timetable_app.app.app_context():
+        class_names = [row['name'] for row in timetable_app.get_db().execute('SELECT name FROM classes ORDER BY name').fetchall()]
+
+    db_path = ctx.obj['db_path']
+    with ProcessPoolExecutor(max_workers=max(workers, 1)) as pool:
+        futures = [pool.submit(_export_class, db_path, name, fmt, out_dir) for name in class_names]
+        for future in futures:
+            class_name, path = future.result()
+            click.echo(f'{class_name}: {path or "not found"}')
+
+
+if __name__ == '__main__':
+    cli()
@@ -0,0 +1,36 @@
+import gzip
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available.
+    brotli = None
+
+# Negotiated compression for JSON API responses.
+MIN_SIZE = 1024
+COMPRESSIBLE_TYPES = ('application/json',)
+
+
+def compress_response(response):
+    if (response.direct_passthrough or response.status_code != 200
+            or response.mimetype not in COMPRESSIBLE_TYPES
+            or 'Content-Encoding' in response.headers):
+        return response
+
+    data = response.get_data()
+    if len(data) < MIN_SIZE:
+        return response
+
+    accepted = request.accept_encodings
+    if brotli is not None and accepted['br']:
+        encoding, body = 'br', brotli.compress(data, quality=5)
+    elif accepted['gzip']:
+        encoding, body = 'gzip', gzip.compress(data, compresslevel=6)
+    else:
+        return response
+
+    response.set_data(body)
+    response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    return response
@@ -0,0 +1,88 @@
+import json
+import sqlite3
+import threading
+import time
+
+import changelog
+
+# Live timetable updates pushed over server-sent events. The timetable_changes log is the source
+# of truth: every stream follows it by seq, so writes made by any process reach every client and a
+# reconnecting client resumes from its Last-Event-ID. In-process writers also call notify() to wake
+# streams immediately instead of waiting for the next poll.
+_subscribers = []
+_lock = threading.Lock()
+
+KEEPALIVE_SECONDS = 15
+POLL_INTERVAL_SECONDS = 1
+
+
+def subscribe():
+    wake = threading.Event()
+    with _lock:
+        _subscribers.append(wake)
+    return wake
+
+
+def unsubscribe(wake):
+    with _lock:
+        if wake in _subscribers:
+            _subscribers.remove(wake)
+
+
+def notify():
+    with _lock:
+        targets = list(_subscribers)
+    for wake in targets:
+        wake.set()
+
+
+def read_events(db, since, class_id, details_query):
+    # Returns (events, seq reached). A class_id of None follows every class. Only the latest state of
+    # each touched slot is sent; a client older than the log floor is told to refetch instead.
+    db.execute('BEGIN')
+    try:
+        head = changelog.current_seq(db)
+        if head <= since:
+            return [], since
+        changed = changelog.changes_since(db, since, class_id)
+        if changed is None:
+            return [{'type': 'reset', 'class_id': class_id, 'seq': head}], head
+        details = {}
+        if changed:
+            placeholders = ','.join('?' * len(changed))
+            for row in db.execute(details_query + f' WHERE ts.slot_id IN ({placeholders})', list(changed)).fetchall():
+                details[row['slot_id']] = dict(row)
+    finally:
+        db.execute('COMMIT')
+    events = []
+    for slot_id, (seq, slot_class_id) in sorted(changed.items(), key=lambda item: item[1][0]):
+        if slot_id in details:
+            events.append({'type': 'upsert', 'class_id': details[slot_id]['class_id'], 'slot': details[slot_id], 'seq': seq})
+        else:
+            events.append({'type': 'delete', 'class_id': slot_class_id, 'slot_id': slot_id, 'seq': seq})
+    return events, head
+
+
+def stream(db_path, class_id, since, details_query):
+    # `since` is the last seq the client has applied, or None to start from the current head.
+    wake = subscribe()
+    db = sqlite3.connect(db_path, timeout=30, isolation_level=None, check_same_thread=False)
+    db.row_factory = sqlite3.Row
+    try:
+        yield 'retry: 3000\n\n'
+        if since is None:
+            since = changelog.current_seq(db)
+        last_sent = time.monotonic()
+        while True:
+            events, since = read_events(db, since, class_id, details_query)
+            for event in events:
+                yield f"id: {event['seq']}\nevent: {event['type']}\ndata: {json.dumps(event)}\n\n"
+                last_sent = time.monotonic()
+            if time.monotonic() - last_sent >= KEEPALIVE_SECONDS:
+                yield ': keepalive\n\n'
+                last_sent = time.monotonic()
+            wake.wait(POLL_INTERVAL_SECONDS)
+            wake.clear()
+    finally:
+        unsubscribe(wake)
+        db.close()
@@ -0,0 +1,106 @@
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+
+# Database-backed single-flight for timetable generation. The first request records a 'running'
+# row and does the work; concurrent requests from any process wait for that row and share its
+# result. The owner refreshes a heartbeat, and a run whose heartbeat stops is treated as stale.
+STALE_AFTER_SECONDS = 120
+POLL_INTERVAL_SECONDS = 0.2
+KEEP_RUNS = 50
+
+
+def init_generation_lock(db):
+    db.executescript('''
+        CREATE TABLE IF NOT EXISTS generation_runs (
+            run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            status TEXT NOT NULL,
+            owner TEXT,
+            started_at REAL NOT NULL,
+            heartbeat_at REAL NOT NULL,
+            finished_at REAL,
+            result TEXT
+        );
+    ''')
+
+
+def _connect(db_path):
+    conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def _claim(conn, stale_after):
+    # Returns (run_id, is_owner). BEGIN IMMEDIATE serialises claims across processes.
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        now = time.time()
+        row = conn.execute("SELECT run_id, heartbeat_at FROM generation_runs WHERE status = 'running' ORDER BY run_id DESC LIMIT 1").fetchone()
+        if row and now - row['heartbeat_at'] > stale_after:
+            conn.execute("UPDATE generation_runs SET status = 'failed', finished_at = ?, result = ? WHERE run_id = ?",
+                         (now, json.dumps({'error': 'Generation run went stale and was recovered.'}), row['run_id']))
+            row = None
+        if row:
+            conn.execute('COMMIT')
+            return row['run_id'], False
+        owner = f'{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}'
+        run_id = conn.execute("INSERT INTO generation_runs (status, owner, started_at, heartbeat_at) VALUES ('running', ?, ?, ?)",
+                              (owner, now, now)).lastrowid
+        conn.execute('DELETE FROM generation_runs WHERE run_id <= ?', (run_id - KEEP_RUNS,))
+        conn.execute('COMMIT')
+        return run_id, True
+    except Exception:
+        conn.execute('ROLLBACK')
+        raise
+
+
+def _heartbeat(db_path, run_id, stop, interval):
+    conn = _connect(db_path)
+    try:
+        while not stop.wait(interval):
+            try:
+                conn.execute('UPDATE generation_runs SET heartbeat_at = ? WHERE run_id = ?', (time.time(), run_id))
+            except sqlite3.OperationalError:
+                continue  # e.g. the database stayed locked past the timeout; retry on the next tick.
+    finally:
+        conn.close()
+
+
+def single_flight(db_path, work, stale_after=STALE_AFTER_SECONDS):
+    # Returns (result, joined). `work` must return something JSON-serialisable.
+    conn = _connect(db_path)
+    try:
+        while True:
+            run_id, is_owner = _claim(conn, stale_after)
+            if is_owner:
+                break
+            while True:
+                time.sleep(POLL_INTERVAL_SECONDS)
+                row = conn.execute('SELECT status, heartbeat_at, result FROM generation_runs WHERE run_id = ?', (run_id,)).fetchone()
+                if row is None or row['status'] == 'running' and time.time() - row['heartbeat_at'] > stale_after:
+                    break  # Owner vanished; go back and try to take over.
+                if row['status'] == 'done':
+                    return json.loads(row['result']), True
+                if row['status'] == 'failed':
+                    raise RuntimeError(json.loads(row['result'] or '{}').get('error', 'Generation failed.'))
+
+        stop = threading.Event()
+        beater = threading.Thread(target=_heartbeat, args=(db_path, run_id, stop, stale_after / 4), daemon=True)
+        beater.start()
+        try:
+            result = work()
+        except Exception as e:
+            conn.execute("UPDATE generation_runs SET status = 'failed', finished_at = ?, result = ? WHERE run_id = ?",
+                         (time.time(), json.dumps({'error': str(e)}), run_id))
+            raise
+        finally:
+            stop.set()
+            beater.join()
+        conn.execute("UPDATE generation_runs SET status = 'done', finished_at = ?, result = ? WHERE run_id = ?",
+                     (time.time(), json.dumps(result), run_id))
+        return result, False
+    finally:
+        conn.close()
@@ -0,0 +1,180 @@
+import json
+import math
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import click
+from werkzeug.serving import WSGIRequestHandler, make_server
+
+import app as timetable_app
+
+# Load-test harness for the public read endpoints: seeds a synthetic database, serves the app
+# with a threaded WSGI server and reports latency percentiles per endpoint.
+SCHEDULE = [
+    (0, '09:00 AM', '10:00 AM', None),
+    (0, '10:00 AM', '11:00 AM', None),
+    (1, '11:00 AM', '11:15 AM', 'Short Break'),
+    (0, '11:15 AM', '12:15 PM', None),
+    (0, '12:15 PM', '01:15 PM', None),
+    (1, '01:15 PM', '02:00 PM', 'Lunch Break'),
+    (0, '02:00 PM', '03:00 PM', None),
+    (0, '03:00 PM', '04:00 PM', None),
+]
+
+# name: (path, weight, headers). The public page loads the compact format plus the dictionary,
+# compressed, so those dominate; the verbose grid is still used by the admin views.
+GZIP = {'Accept-Encoding': 'gzip'}
+ENDPOINTS = {
+    'timetable_compact': ('/api/timetables/{class_name}?format=compact', 40, GZIP),
+    'dictionary': ('/api/timetable/dictionary', 20, GZIP),
+    'timetable': ('/api/timetables/{class_name}', 10, GZIP),
+    'export_pdf': ('/api/export/pdf/{class_name}', 15, {}),
+    'export_excel': ('/api/export/excel/{class_name}', 10, {}),
+    'index': ('/', 5, {}),
+}
+
+
+class QuietRequestHandler(WSGIRequestHandler):
+    def log_request(self, *args, **kwargs):
+        pass
+
+
+def seed_database(db_path, num_classes, num_teachers, subjects_per_class, seed):
+    rng = random.Random(seed)
+    timetable_app.DB_PATH = db_path
+    timetable_app.init_db()
+    with timetable_app.app.app_context():
+        db = timetable_app.get_db()
+        db.executemany('INSERT INTO schedule_config (is_break, start_time, end_time, break_name) VALUES (?, ?, ?, ?)', SCHEDULE)
+        db.executemany('INSERT INTO teachers (name) VALUES (?)', [(f'Teacher {i}',) for i in range(1, num_teachers + 1)])
+        db.executemany('INSERT INTO subjects (name, code) VALUES (?, ?)',
+                       [(f'Subject {i}', f'SUB{i:04d}') for i in range(1, subjects_per_class * 4 + 1)])
+        num_rooms = max(num_classes, 4)
+        db.executemany('INSERT INTO classrooms (name, is_lab) VALUES (?, 0)', [(f'Room {i}',) for i in range(1, num_rooms + 1)])
+        db.executemany('INSERT INTO classrooms (name, is_lab) VALUES (?, 1)', [(f'Lab {i}',) for i in range(1, num_rooms // 4 + 2)])
+        db.executemany('INSERT INTO classes (name, num_batches) VALUES (?, ?)',
+                       [(f'Class-{i}', rng.choice([1, 2, 3])) for i in range(1, num_classes + 1)])
+
+        teacher_ids = [r[0] for r in db.execute('SELECT teacher_id FROM teachers')]
+        subject_ids = [r[0] for r in db.execute('SELECT subject_id FROM subjects')]
+        lab_ids = [r[0] for r in db.execute('SELECT classroom_id FROM classrooms WHERE is_lab = 1')]
+        courses = []
+        for (class_id,) in db.execute('SELECT class_id FROM classes').fetchall():
+            for subject_id in rng.sample(subject_ids, subjects_per_class):
+                is_lab = 1 if rng.random() < 0.25 else 0
+                courses.append((class_id, subject_id, rng.choice(teacher_ids), rng.randint(2, 4), is_lab,
+                                rng.choice(lab_ids) if is_lab else None))
+        db.executemany('INSERT INTO courses (class_id, subject_id, teacher_id, weekly_lectures, is_lab, classroom_id) VALUES (?, ?, ?, ?, ?, ?)', courses)
+        db.commit()
+
+        result = timetable_app.generate_timetable(seed=seed)
+        class_names = [r[0] for r in db.execute('SELECT name FROM classes')]
+    return class_names, len(result['placements'])
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(pct / 100 * len(sorted_values)) - 1, 0)
+    return sorted_values[rank]
+
+
+def run_load(base_url, class_names, concurrency, duration, seed):
+    rng = random.Random(seed)
+    names = list(ENDPOINTS)
+    weights = [ENDPOINTS[n][1] for n in names]
+    stats = defaultdict(lambda: {'latencies': [], 'errors': 0})
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker(worker_seed):
+        local_rng = random.Random(worker_seed)
+        while time.perf_counter() < deadline:
+            name = local_rng.choices(names, weights)[0]
+            path_template, _, headers = ENDPOINTS[name]
+            path = path_template.format(class_name=urllib.parse.quote(local_rng.choice(class_names)))
+            started = time.perf_counter()
+            ok = True
+            try:
+                with urllib.request.urlopen(urllib.request.Request(base_url + path, headers=headers), timeout=30) as response:
+                    response.read()
+                    ok = response.status == 200
+            except (urllib.error.URLError, OSError):
+                ok = False
+            elapsed = (time.perf_counter() - started) * 1000
+            with lock:
+                stats[name]['latencies'].append(elapsed)
+                if not ok:
+                    stats[name]['errors'] += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for i in range(concurrency):
+            pool.submit(worker, rng.randrange(2**31))
+    wall = time.perf_counter() - started
+
+    report = {}
+    for name, data in sorted(stats.items()):
+        latencies = sorted(data['latencies'])
+        count = len(latencies)
+        report[name] = {
+            'requests': count,
+            'rps': round(count / wall, 1),
+            'error_rate': round(data['errors'] / count, 4) if count else 0.0,
+            'p50_ms': round(percentile(latencies, 50), 1),
+            'p95_ms': round(percentile(latencies, 95), 1),
+            'p99_ms': round(percentile(latencies, 99), 1),
+        }
+    return report, wall
+
+
+@click.command()
+@click.option('--classes', 'num_classes', type=int, default=20, show_default=True, help='Synthetic classes to seed.')
+@click.option('--teachers', 'num_teachers', type=int, default=40, show_default=True)
+@click.option('--subjects-per-class', type=int, default=6, show_default=True)
+@click.option('--concurrency', type=int, default=16, show_default=True, help='Concurrent client threads.')
+@click.option('--duration', type=float, default=20.0, show_default=True, help='Seconds of traffic to drive.')
+@click.option('--seed', type=int, default=1, show_default=True)
+@click.option('--json', 'as_json', is_flag=True, help='Print the report as JSON.')
+@click.option('--max-p95-ms', type=float, default=None, help='Exit non-zero if any endpoint p95 exceeds this.')
+@click.option('--max-error-rate', type=float, default=0.0, show_default=True, help='Exit non-zero above this error rate.')
+def main(num_classes, num_teachers, subjects_per_class, concurrency, duration, seed, as_json, max_p95_ms, max_error_rate):
+    """Seed a synthetic database and load-test the public timetable and export endpoints."""
+    with tempfile.TemporaryDirectory(prefix='timetable-loadtest-') as workdir:
+        db_path = os.path.join(workdir, 'timetable.db')
+        class_names, placed = seed_database(db_path, num_classes, num_teachers, subjects_per_class, seed)
+
+        server = make_server('127.0.0.1', 0, timetable_app.app, threaded=True, request_handler=QuietRequestHandler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            report, wall = run_load(f'http://127.0.0.1:{server.server_port}', class_names, concurrency, duration, seed)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    if as_json:
+        click.echo(json.dumps({'classes': len(class_names), 'slots': placed, 'seconds': round(wall, 2), 'endpoints': report}, indent=2))
+    else:
+        click.echo(f'{len(class_names)} classes, {placed} slots, {concurrency} clients, {wall:.1f}s')
+        click.echo(f"{'endpoint':<19}{'requests':>10}{'req/s':>9}{'errors':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+        for name, row in report.items():
+            click.echo(f"{name:<19}{row['requests']:>10}{row['rps']:>9}{row['error_rate']:>9.2%}{row['p50_ms']:>9}{row['p95_ms']:>9}{row['p99_ms']:>9}")
+
+    failed = any(row['error_rate'] > max_error_rate for row in report.values())
+    if max_p95_ms is not None:
+        failed = failed or any(row['p95_ms'] > max_p95_ms for row in report.values())
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -66,6 +66,106 @@ document.addEventListener('DOMContentLoaded', () => {
   }
 
 
+  // Data tables are filled page by page from /api/manage/<section> when they scroll into view.
+  const escapeHtml = (value) => String(value ?? '').replace(/[&<>"']/g, ch => ({
+    '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'
+  })[ch]);
+
+  function deleteForm(action, entity, id) {
+    return `<form action="${action}" method="post" onsubmit="return confirm('Delete this ${entity}?');">
+                <input type="hidden" name="form_name" value="delete_${entity}_form">
+                <input type="hidden" name="${entity}_id" value="${id}">
+                <button type="submit" class="btn btn-danger btn-sm"><i class="bi bi-trash"></i></button>
+            </form>`;
+  }
+
+  const sectionRows = {
+    teachers: (t, action) => `<tr>
+                <td>${t.teacher_id}</td>
+                <td>${escapeHtml(t.name)}</td>
+                <td>${escapeHtml(t.preference || 'N/A')}</td>
+                <td>${deleteForm(action, 'teacher', t.teacher_id)}</td>
+            </tr>`,
+    subjects: (s, action) => `<tr>
+                <td>${s.subject_id}</td>
+                <td>${escapeHtml(s.name)}</td>
+                <td>${escapeHtml(s.code)}</td>
+                <td>${deleteForm(action, 'subject', s.subject_id)}</td>
+            </tr>`,
+    classes: (c, action) => `<tr>
+                <td>${escapeHtml(c.name)}</td>
+                <td>${c.num_batches}</td>
+                <td>${deleteForm(action, 'class', c.class_id)}</td>
+            </tr>`,
+    classrooms: (r, action) => `<tr>
+                <td>${escapeHtml(r.name)}</td>
+                <td>${r.is_lab ? 'Lab' : 'Theory'}</td>
+                <td>${deleteForm(action, 'classroom', r.classroom_id)}</td>
+            </tr>`,
+    courses: (c, action) => `<tr>
+                <td>${escapeHtml(c.class_name)}</td>
+                <td>${escapeHtml(c.subject_name)}</td>
+                <td>${escapeHtml(c.teacher_name)}</td>
+                <td>${c.is_lab ? 'Lab' : 'Theory'}</td>
+                <td>${deleteForm(action, 'course', c.course_id)}</td>
+            </tr>`
+  };
+
+  async function loadSectionPage(tbody) {
+    const section = tbody.dataset.section;
+    const loadMoreBtn = document.querySelector(`.load-more[data-section="${section}"]`);
+    const after = tbody.dataset.nextAfter || 0;
+    if (tbody.dataset.loading === '1') return;
+    tbody.dataset.loading = '1';
+
+    tbody.querySelectorAll('.load-error').forEach(row => row.remove());
+
+    try {
+      const res = await fetch(`/api/manage/${section}?after=${after}`);
+      if (!res.ok) throw new Error(`HTTP ${res.status}`);
+      const data = await res.json();
+      tbody.insertAdjacentHTML('beforeend', data.items.map(item => sectionRows[section](item, tbody.dataset.deleteAction)).join(''));
+      if (!tbody.children.length) {
+        tbody.innerHTML = `<tr><td colspan="${tbody.dataset.colspan}" class="text-muted">No records.</td></tr>`;
+      }
+      tbody.dataset.nextAfter = data.next_after || '';
+      if (loadMoreBtn) loadMoreBtn.style.display = data.next_after ? 'inline-block' : 'none';
+    } catch (err) {
+      // Keep the cursor so the load-more button retries the same page.
+      tbody.insertAdjacentHTML('beforeend', `<tr class="load-error"><td colspan="${tbody.dataset.colspan}" class="text-danger">Could not load records (${escapeHtml(err.message)}).</td></tr>`);
+      if (loadMoreBtn) loadMoreBtn.style.display = 'inline-block';
+    } finally {
+      tbody.dataset.loading = '';
+    }
+  }
+
+  const sectionBodies = document.querySelectorAll('tbody[data-section]');
+  if (sectionBodies.length) {
+    const observer = window.IntersectionObserver ? new IntersectionObserver((entries) => {
+      entries.forEach(entry => {
+        if (entry.isIntersecting) {
+          observer.unobserve(entry.target);
+          loadSectionPage(entry.target);
+        }
+      });
+    }) : null;
+
+    sectionBodies.forEach(tbody => {
+      if (observer) {
+        observer.observe(tbody);
+      } else {
+        loadSectionPage(tbody);
+      }
+    });
+
+    document.querySelectorAll('.load-more[data-section]').forEach(button => {
+      button.addEventListener('click', () => {
+        loadSectionPage(document.querySelector(`tbody[data-section="${button.dataset.section}"]`));
+      });
+    });
+  }
+
+
   // This part was mistakenly removed and is now restored.
   // It handles the timetable display and modal on the manage page.
   const editSlotModalElement = document.getElementById('editSlotModal');
@@ -85,6 +185,10 @@ document.addEventListener('DOMContentLoaded', () => {
     const deleteSlotBtn = document.getElementById('deleteSlotBtn');
     const validationAlert = document.getElementById('validation-alert');
 
+    let currentData = null;
+    let currentClassId = null;
+    let eventSource = null;
+
     // Initial render if elements exist
     if (classSelect) {
       renderTimetable();
@@ -100,7 +204,7 @@ document.addEventListener('DOMContentLoaded', () => {
         alert(data.message);
         generateBtn.disabled = false;
         generateBtn.innerText = 'Generate Timetable';
-        renderTimetable();
+        if (!eventSource) renderTimetable();
       });
     }
 
@@ -210,7 +314,7 @@ document.addEventListener('DOMContentLoaded', () => {
         if (data.status === 'success') {
           alert(data.message);
           editSlotModal.hide();
-          renderTimetable();
+          if (data.slot) patchSlot(data.slot);
         } else {
           validationAlert.innerText = data.message;
           validationAlert.classList.remove('d-none');
@@ -236,7 +340,7 @@ document.addEventListener('DOMContentLoaded', () => {
           if (data.status === 'success') {
             alert(data.message);
             editSlotModal.hide();
-            renderTimetable();
+            removeSlot(Number(slotId));
           } else {
             alert('Error deleting slot: ' + data.message);
           }
@@ -249,13 +353,15 @@ document.addEventListener('DOMContentLoaded', () => {
       const selectedClass = classSelect.value;
       if (!selectedClass) {
         document.getElementById('timetableContainer').innerHTML = '<p class="text-center">Please select a class.</p>';
+        subscribeToUpdates(null);
         return;
       }
 
       const res = await fetch(`/api/timetables/${selectedClass}`);
       const data = await res.json();
       const timetableContainer = document.getElementById('timetableContainer');
-      const classId = classSelect.options[classSelect.selectedIndex].dataset.id;
+      currentData = data;
+      currentClassId = classSelect.options[classSelect.selectedIndex].dataset.id;
 
       let html = `
               <h2 class="mb-3">Timetable for ${selectedClass}</h2>
@@ -278,13 +384,27 @@ document.addEventListener('DOMContentLoaded', () => {
         }
         return `<tr>
                                           <td>${timeFormatted}</td>
-                                          ${data.days.map(day => {
-          const cellData = data.grid[day][slot.start_time];
-          if (cellData) {
-            return `<td class="${cellData.is_lab ? 'lab-session' : 'theory-session'}"
+                                          ${data.days.map(day => renderCell(day, slot.start_time)).join('')}
+                                      </tr>`;
+      }).join('')}
+                      </tbody>
+                  </table>
+              </div>
+          `;
+      timetableContainer.innerHTML = html;
+
+      // Modal pop-up for editing/adding slots
+      document.querySelectorAll('.timetable-table td').forEach(attachCellListener);
+      subscribeToUpdates(selectedClass);
+    }
+
+    function renderCell(day, startTime) {
+      const cellData = (currentData.grid[day][startTime] || [])[0];
+      if (cellData) {
+        return `<td class="${cellData.is_lab ? 'lab-session' : 'theory-session'}"
                                                               data-day="${day}"
-                                                              data-time="${slot.start_time}"
-                                                              data-class-id="${classId}"
+                                                              data-time="${startTime}"
+                                                              data-class-id="${currentClassId}"
                                                               data-slot-id="${cellData.slot_id}"
                                                               data-subject-id="${cellData.subject_id}"
                                                               data-teacher-id="${cellData.teacher_id}"
@@ -295,67 +415,108 @@ document.addEventListener('DOMContentLoaded', () => {
                                                               <small>${cellData.teacher_name}</small><br>
                                                               <small class="text-muted">@${cellData.classroom_name}</small>
                                                           </td>`;
-          } else {
-            return `<td class="empty-slot"
+      }
+      return `<td class="empty-slot"
                                                               data-day="${day}"
-                                                              data-time="${slot.start_time}"
-                                                              data-class-id="${classId}"
+                                                              data-time="${startTime}"
+                                                              data-class-id="${currentClassId}"
                                                               data-bs-toggle="modal"
                                                               data-bs-target="#editSlotModal">
                                                               Click to add
                                                           </td>`;
-          }
-        }).join('')}
-                                      </tr>`;
-      }).join('')}
-                      </tbody>
-                  </table>
-              </div>
-          `;
-      timetableContainer.innerHTML = html;
+    }
 
-      // Modal pop-up for editing/adding slots
-      document.querySelectorAll('.timetable-table td').forEach(cell => {
-        cell.addEventListener('click', (e) => {
-          const day = e.target.dataset.day;
-          const time = e.target.dataset.time;
-          if (!day || !time) return;
-
-          const slotId = e.target.dataset.slotId || '';
-          const subjectId = e.target.dataset.subjectId || '';
-          const teacherId = e.target.dataset.teacherId || '';
-          const classroomId = e.target.dataset.classroomId || '';
-          const classId = e.target.dataset.classId;
-
-          modalDay.value = day;
-          modalTime.value = time;
-          modalSlotId.value = slotId;
-          modalClassId.value = classId;
-          modalStartTime.value = time;
-
-          const fullSlot = data.slots_full.find(s => s.start_time === time);
-          modalEndTime.value = fullSlot ? fullSlot.end_time : '';
-
-          populateSelect(modalSubject, data.options.subjects, 'subject_id', 'name', subjectId);
-          populateSelect(modalTeacher, data.options.teachers, 'teacher_id', 'name', teacherId);
-          populateSelect(modalClassroom, data.options.classrooms, 'classroom_id', 'name', classroomId);
-
-          validationAlert.classList.add('d-none');
-
-          // Set modal title and show/hide delete button
-          if (slotId) {
-            modalTitle.innerText = 'Edit Slot';
-            deleteSlotBtn.style.display = 'inline-block';
-          } else {
-            modalTitle.innerText = 'Add New Slot';
-            deleteSlotBtn.style.display = 'none';
-          }
+    // Re-render a single grid cell in place after a live update.
+    function refreshCell(day, startTime) {
+      const cell = document.querySelector(`.timetable-table td[data-day="${day}"][data-time="${startTime}"]`);
+      if (!cell) return;
+      const template = document.createElement('template');
+      template.innerHTML = renderCell(day, startTime).trim();
+      const newCell = template.content.firstElementChild;
+      cell.replaceWith(newCell);
+      attachCellListener(newCell);
+    }
 
-          editSlotModal.show();
+    function removeSlot(slotId) {
+      if (!currentData) return;
+      Object.entries(currentData.grid).forEach(([day, cells]) => {
+        Object.entries(cells).forEach(([startTime, entries]) => {
+          const remaining = entries.filter(entry => entry.slot_id !== slotId);
+          if (remaining.length !== entries.length) {
+            cells[startTime] = remaining;
+            refreshCell(day, startTime);
+          }
         });
       });
     }
 
+    function patchSlot(slot) {
+      if (!currentData || String(slot.class_id) !== String(currentClassId)) return;
+      removeSlot(slot.slot_id);
+      const cells = currentData.grid[slot.day];
+      if (!cells) return;
+      currentData.slots_full.filter(s => s.is_break === 0).forEach(s => {
+        if (!(s.end_time <= slot.time_start || s.start_time >= slot.time_end) && cells[s.start_time]) {
+          cells[s.start_time].push(slot);
+          refreshCell(slot.day, s.start_time);
+        }
+      });
+    }
+
+    function subscribeToUpdates(className) {
+      if (eventSource) {
+        eventSource.close();
+        eventSource = null;
+      }
+      if (!className || !window.EventSource) return;
+
+      eventSource = new EventSource(`/api/timetable/stream?class=${encodeURIComponent(className)}&since=${currentData.seq}`);
+      eventSource.addEventListener('upsert', (e) => patchSlot(JSON.parse(e.data).slot));
+      eventSource.addEventListener('delete', (e) => removeSlot(JSON.parse(e.data).slot_id));
+      eventSource.addEventListener('reset', () => renderTimetable());
+    }
+
+    function attachCellListener(cell) {
+      cell.addEventListener('click', (e) => {
+        const day = e.target.dataset.day;
+        const time = e.target.dataset.time;
+        if (!day || !time) return;
+        const data = currentData;
+
+        const slotId = e.target.dataset.slotId || '';
+        const subjectId = e.target.dataset.subjectId || '';
+        const teacherId = e.target.dataset.teacherId || '';
+        const classroomId = e.target.dataset.classroomId || '';
+        const classId = e.target.dataset.classId;
+
+        modalDay.value = day;
+        modalTime.value = time;
+        modalSlotId.value = slotId;
+        modalClassId.value = classId;
+        modalStartTime.value = time;
+
+        const fullSlot = data.slots_full.find(s => s.start_time === time);
+        modalEndTime.value = fullSlot ? fullSlot.end_time : '';
+
+        populateSelect(modalSubject, data.options.subjects, 'subject_id', 'name', subjectId);
+        populateSelect(modalTeacher, data.options.teachers, 'teacher_id', 'name', teacherId);
+        populateSelect(modalClassroom, data.options.classrooms, 'classroom_id', 'name', classroomId);
+
+        validationAlert.classList.add('d-none');
+
+        // Set modal title and show/hide delete button
+        if (slotId) {
+          modalTitle.innerText = 'Edit Slot';
+          deleteSlotBtn.style.display = 'inline-block';
+        } else {
+          modalTitle.innerText = 'Add New Slot';
+          deleteSlotBtn.style.display = 'none';
+        }
+
+        editSlotModal.show();
+      });
+    }
+
     function populateSelect(selectElement, items, valueKey, textKey, selectedValue) {
       selectElement.innerHTML = '<option value="">-- Select --</option>';
       items.forEach(item => {
@@ -19,6 +19,10 @@ document.addEventListener('DOMContentLoaded', () => {
   const clearSlotBtn = document.getElementById('clearSlotBtn');
   const validationAlert = document.getElementById('validation-alert');
 
+  let currentData = null;
+  let currentClassId = null;
+  let eventSource = null;
+
   // Initial render
   renderTimetable();
 
@@ -31,7 +35,8 @@ document.addEventListener('DOMContentLoaded', () => {
     alert(data.message);
     generateBtn.disabled = false;
     generateBtn.innerHTML = '<i class="bi bi-arrow-clockwise"></i> Generate';
-    renderTimetable();
+    // Connected clients get a reset event from the server; only refetch when live updates are unavailable.
+    if (!eventSource) renderTimetable();
   });
 
   classSelect.addEventListener('change', () => {
@@ -75,7 +80,7 @@ document.addEventListener('DOMContentLoaded', () => {
     const data = await res.json();
     if (data.status === 'success') {
       editSlotModal.hide();
-      renderTimetable();
+      if (data.slot) patchSlot(data.slot);
     } else {
       validationAlert.innerText = data.message;
       validationAlert.classList.remove('d-none');
@@ -95,7 +100,7 @@ document.addEventListener('DOMContentLoaded', () => {
       const data = await res.json();
       if (data.status === 'success') {
         editSlotModal.hide();
-        renderTimetable();
+        removeSlot(Number(modalSlotId.value));
       } else {
         alert('Error clearing slot: ' + data.message);
       }
@@ -106,13 +111,14 @@ document.addEventListener('DOMContentLoaded', () => {
     const selectedClass = classSelect.value;
     if (!selectedClass) {
       document.getElementById('timetableContainer').innerHTML = '<p class="text-center text-muted">Please select a class to view the timetable.</p>';
+      subscribeToUpdates(null);
       return;
     }
 
-    const res = await fetch(`/api/timetables/${selectedClass}`);
-    const data = await res.json();
+    currentClassId = classSelect.options[classSelect.selectedIndex].dataset.id;
+    const data = await fetchTimetable(selectedClass);
     const timetableContainer = document.getElementById('timetableContainer');
-    const classId = classSelect.options[classSelect.selectedIndex].dataset.id;
+    currentData = data;
 
     let html = `
             <h2 class="h4 mb-3">Timetable for ${selectedClass}</h2>
@@ -142,17 +148,95 @@ document.addEventListener('DOMContentLoaded', () => {
 
       return `<tr>
                 <td>${timeFormatted}</td>
-                ${data.days.map(day => {
-        const cellDataArray = data.grid[day][slot.start_time];
-        if (cellDataArray && cellDataArray.length > 0) {
-          return `<td class="has-content">
+                ${data.days.map(day => renderCell(day, slot.start_time)).join('')}
+            </tr>`;
+    }).join('')}
+                </tbody>
+            </table>
+        `;
+    timetableContainer.innerHTML = html;
+
+    // Re-attach event listeners for the new timetable
+    document.querySelectorAll('.timetable-table td[data-day]').forEach(attachCellListener);
+    // Saved variants (e.g. the published one) never change, so only the working table is followed live.
+    subscribeToUpdates(data.seq != null ? selectedClass : null);
+  }
+
+  // Fetch the compact, id-based timetable plus the shared dictionary and expand them into
+  // the grid/slots_full/options shape the rest of this file works with.
+  async function fetchTimetable(className) {
+    const [timetableRes, dictionaryRes] = await Promise.all([
+      fetch(`/api/timetables/${className}?format=compact`),
+      fetch('/api/timetable/dictionary')
+    ]);
+    return expandCompactTimetable(await timetableRes.json(), await dictionaryRes.json());
+  }
+
+  function expandCompactTimetable(compact, dictionary) {
+    const toOptions = (pairs, idKey) => pairs.map(([id, name]) => ({ [idKey]: id, name }));
+    const options = {
+      teachers: toOptions(dictionary.teachers, 'teacher_id'),
+      subjects: toOptions(dictionary.subjects, 'subject_id'),
+      classrooms: toOptions(dictionary.classrooms, 'classroom_id')
+    };
+    const names = (pairs) => new Map(pairs);
+    const teacherNames = names(dictionary.teachers);
+    const subjectNames = names(dictionary.subjects);
+    const classroomNames = names(dictionary.classrooms);
+
+    const slotsFull = compact.slots.start_time.map((startTime, i) => ({
+      start_time: startTime,
+      end_time: compact.slots.end_time[i],
+      is_break: compact.slots.is_break[i],
+      break_name: compact.slots.break_name[i]
+    }));
+    const teachable = slotsFull.filter(s => s.is_break === 0);
+
+    const grid = {};
+    compact.days.forEach(day => {
+      grid[day] = {};
+      teachable.forEach(s => { grid[day][s.start_time] = []; });
+    });
+
+    const cells = compact.cells;
+    cells.slot_id.forEach((slotId, i) => {
+      const day = compact.days[cells.day[i]];
+      const first = teachable[cells.start[i]];
+      const last = teachable[cells.start[i] + cells.span[i] - 1];
+      const entry = {
+        slot_id: slotId,
+        class_id: Number(currentClassId),
+        day,
+        time_start: first.start_time,
+        time_end: last.end_time,
+        subject_id: cells.subject_id[i],
+        teacher_id: cells.teacher_id[i],
+        classroom_id: cells.classroom_id[i],
+        batch_number: cells.batch_number[i],
+        is_lab: cells.is_lab[i],
+        subject_name: subjectNames.get(cells.subject_id[i]),
+        teacher_name: teacherNames.get(cells.teacher_id[i]),
+        classroom_name: classroomNames.get(cells.classroom_id[i])
+      };
+      for (let k = 0; k < cells.span[i]; k++) {
+        grid[day][teachable[cells.start[i] + k].start_time].push(entry);
+      }
+    });
+
+    return { grid, days: compact.days, slots_full: slotsFull, options, seq: compact.seq };
+  }
+
+  function renderCell(day, startTime) {
+    const cellDataArray = currentData.grid[day][startTime];
+    if (cellDataArray && cellDataArray.length > 0) {
+      return `<td class="has-content" data-day="${day}" data-time="${startTime}">
                     <div class="cell-content-wrapper">
                     ${cellDataArray.map(cellData => {
-            let batch_info = cellData.is_lab && cellData.batch_number ? `<br><small class="text-info">Batch ${cellData.batch_number}</small>` : '';
-            return `<div class="timetable-entry ${cellData.is_lab ? 'lab-session' : 'theory-session'}"
+        let batch_info = cellData.is_lab && cellData.batch_number ? `<br><small class="text-info">Batch ${cellData.batch_number}</small>` : '';
+        return `<div class="timetable-entry ${cellData.is_lab ? 'lab-session' : 'theory-session'}"
                                 data-day="${day}" 
-                                data-time="${slot.start_time}" 
-                                data-class-id="${classId}"
+                                data-time="${startTime}" 
+                                data-class-id="${currentClassId}"
                                 data-slot-id="${cellData.slot_id}"
                                 data-subject-id="${cellData.subject_id}"
                                 data-teacher-id="${cellData.teacher_id}"
@@ -164,55 +248,93 @@ document.addEventListener('DOMContentLoaded', () => {
                                 <small class="text-muted">@${cellData.classroom_name}</small>
                                 ${batch_info}
                             </div>`;
-          }).join('')}
+      }).join('')}
                     </div>
                 </td>`;
-        } else {
-          return `<td class="empty-slot" 
+    }
+    return `<td class="empty-slot" 
                                 data-day="${day}" 
-                                data-time="${slot.start_time}" 
-                                data-class-id="${classId}"
+                                data-time="${startTime}" 
+                                data-class-id="${currentClassId}"
                                 data-bs-toggle="modal" 
                                 data-bs-target="#editSlotModal">
                                 + Add
                             </td>`;
+  }
+
+  // Re-render a single grid cell in place after a live update.
+  function refreshCell(day, startTime) {
+    const cell = document.querySelector(`.timetable-table td[data-day="${day}"][data-time="${startTime}"]`);
+    if (!cell) return;
+    const template = document.createElement('template');
+    template.innerHTML = renderCell(day, startTime).trim();
+    const newCell = template.content.firstElementChild;
+    cell.replaceWith(newCell);
+    attachCellListener(newCell);
+  }
+
+  function removeSlot(slotId) {
+    if (!currentData) return;
+    Object.entries(currentData.grid).forEach(([day, cells]) => {
+      Object.entries(cells).forEach(([startTime, entries]) => {
+        const remaining = entries.filter(entry => entry.slot_id !== slotId);
+        if (remaining.length !== entries.length) {
+          cells[startTime] = remaining;
+          refreshCell(day, startTime);
         }
-      }).join('')}
-            </tr>`;
-    }).join('')}
-                </tbody>
-            </table>
-        `;
-    timetableContainer.innerHTML = html;
+      });
+    });
+  }
 
-    // Re-attach event listeners for the new timetable
-    attachModalEventListeners(data);
+  function patchSlot(slot) {
+    if (!currentData || String(slot.class_id) !== String(currentClassId)) return;
+    removeSlot(slot.slot_id);
+    const cells = currentData.grid[slot.day];
+    if (!cells) return;
+    currentData.slots_full.filter(s => s.is_break === 0).forEach(s => {
+      if (!(s.end_time <= slot.time_start || s.start_time >= slot.time_end) && cells[s.start_time]) {
+        cells[s.start_time].push(slot);
+        refreshCell(slot.day, s.start_time);
+      }
+    });
+  }
+
+  function subscribeToUpdates(className) {
+    if (eventSource) {
+      eventSource.close();
+      eventSource = null;
+    }
+    if (!className || !window.EventSource) return;
+
+    eventSource = new EventSource(`/api/timetable/stream?class=${encodeURIComponent(className)}&since=${currentData.seq}`);
+    eventSource.addEventListener('upsert', (e) => patchSlot(JSON.parse(e.data).slot));
+    eventSource.addEventListener('delete', (e) => removeSlot(JSON.parse(e.data).slot_id));
+    eventSource.addEventListener('reset', () => renderTimetable());
   }
 
-  function attachModalEventListeners(data) {
-    document.querySelectorAll('.timetable-table td[data-day]').forEach(cell => {
-      cell.addEventListener('click', (e) => {
-        const targetElement = e.target.closest('div[data-day], td[data-day]');
-        if (!targetElement) return;
+  function attachCellListener(cell) {
+    cell.addEventListener('click', (e) => {
+      const targetElement = e.target.closest('div[data-day], td[data-day]');
+      if (!targetElement || !targetElement.dataset.classId) return;
+      const data = currentData;
 
-        const { day, time, classId, slotId, subjectId, teacherId, classroomId } = targetElement.dataset;
+      const { day, time, classId, slotId, subjectId, teacherId, classroomId } = targetElement.dataset;
 
-        modalDay.value = day;
-        modalTime.value = time;
-        modalSlotId.value = slotId || '';
-        modalClassId.value = classId;
-        modalStartTime.value = time;
+      modalDay.value = day;
+      modalTime.value = time;
+      modalSlotId.value = slotId || '';
+      modalClassId.value = classId;
+      modalStartTime.value = time;
 
-        const fullSlot = data.slots_full.find(s => s.start_time === time);
-        modalEndTime.value = fullSlot ? fullSlot.end_time : '';
+      const fullSlot = data.slots_full.find(s => s.start_time === time);
+      modalEndTime.value = fullSlot ? fullSlot.end_time : '';
 
-        populateSelect(modalSubject, data.options.subjects, 'subject_id', 'name', subjectId);
-        populateSelect(modalTeacher, data.options.teachers, 'teacher_id', 'name', teacherId);
-        populateSelect(modalClassroom, data.options.classrooms, 'classroom_id', 'name', classroomId);
+      populateSelect(modalSubject, data.options.subjects, 'subject_id', 'name', subjectId);
+      populateSelect(modalTeacher, data.options.teachers, 'teacher_id', 'name', teacherId);
+      populateSelect(modalClassroom, data.options.classrooms, 'classroom_id', 'name', classroomId);
 
-        validationAlert.classList.add('d-none');
-        editSlotModal.show();
-      });
+      validationAlert.classList.add('d-none');
+      editSlotModal.show();
     });
   }
 
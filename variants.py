@@ -0,0 +1,176 @@
+import json
+import zlib
+from array import array
+from collections import defaultdict
+from datetime import datetime
+
+# Named timetable variants. Every distinct slot row is interned once in slot_pool and a variant
+# is just a compressed array of pool row ids, so snapshots share unchanged rows.
+SLOT_COLUMNS = ('class_id', 'day', 'time_start', 'time_end', 'course_id', 'teacher_id', 'classroom_id', 'batch_number')
+POOL_DETAILS_QUERY = '''
+    SELECT p.row_id as slot_id, p.class_id, p.day, p.time_start, p.time_end, p.course_id, p.teacher_id, p.classroom_id,
+           NULLIF(p.batch_number, 0) as batch_number,
+           t.name as teacher_name, s.name as subject_name, c.name as classroom_name, co.is_lab, co.subject_id
+    FROM slot_pool p
+    JOIN courses co ON p.course_id = co.course_id
+    JOIN subjects s ON co.subject_id = s.subject_id
+    JOIN teachers t ON p.teacher_id = t.teacher_id
+    JOIN classrooms c ON p.classroom_id = c.classroom_id
+'''
+
+
+def init_variants(db):
+    # batch_number is stored as 0 instead of NULL so the UNIQUE constraint can dedupe theory slots.
+    db.executescript('''
+        CREATE TABLE IF NOT EXISTS slot_pool (
+            row_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            class_id INTEGER,
+            day TEXT,
+            time_start TEXT,
+            time_end TEXT,
+            course_id INTEGER,
+            teacher_id INTEGER,
+            classroom_id INTEGER,
+            batch_number INTEGER NOT NULL DEFAULT 0,
+            UNIQUE (class_id, day, time_start, time_end, course_id, teacher_id, classroom_id, batch_number)
+        );
+        CREATE TABLE IF NOT EXISTS timetable_variants (
+            variant_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL UNIQUE,
+            created_at TEXT NOT NULL,
+            slot_count INTEGER NOT NULL,
+            row_ids BLOB NOT NULL
+        );
+    ''')
+
+
+def encode_row_ids(row_ids):
+    return zlib.compress(array('I', sorted(row_ids)).tobytes())
+
+
+def decode_row_ids(blob):
+    ids = array('I')
+    ids.frombytes(zlib.decompress(blob))
+    return ids
+
+
+def intern_current(db):
+    cols = ', '.join(SLOT_COLUMNS)
+    db.execute(f'''
+        INSERT OR IGNORE INTO slot_pool ({cols})
+        SELECT class_id, day, time_start, time_end, course_id, teacher_id, classroom_id, IFNULL(batch_number, 0)
+        FROM timetable_slots
+    ''')
+    match = ' AND '.join(f'p.{c} IS ts.{c}' for c in SLOT_COLUMNS if c != 'batch_number')
+    rows = db.execute(f'''
+        SELECT p.row_id FROM timetable_slots ts
+        JOIN slot_pool p ON {match} AND p.batch_number = IFNULL(ts.batch_number, 0)
+    ''').fetchall()
+    return [row[0] for row in rows]
+
+
+def get_variant(db, name):
+    return db.execute('SELECT * FROM timetable_variants WHERE name = ?', (name,)).fetchone()
+
+
+def get_published(db):
+    row = db.execute("SELECT value FROM generation_settings WHERE key = 'published_variant'").fetchone()
+    return row['value'] if row and row['value'] else None
+
+
+def resolve_row_ids(db, name):
+    if name == 'current':
+        return intern_current(db)
+    if name == 'published':
+        name = get_published(db)
+    variant = get_variant(db, name) if name else None
+    return decode_row_ids(variant['row_ids']) if variant else None
+
+
+def snapshot(db, name):
+    replaced = get_variant(db, name) is not None
+    row_ids = intern_current(db)
+    db.execute('''
+        INSERT INTO timetable_variants (name, created_at, slot_count, row_ids) VALUES (?, ?, ?, ?)
+        ON CONFLICT(name) DO UPDATE SET created_at = excluded.created_at, slot_count = excluded.slot_count, row_ids = excluded.row_ids
+    ''', (name, datetime.now().isoformat(timespec='seconds'), len(row_ids), encode_row_ids(row_ids)))
+    if replaced:
+        prune_pool(db)
+    return len(row_ids)
+
+
+def list_variants(db):
+    published = get_published(db)
+    rows = db.execute('SELECT name, created_at, slot_count FROM timetable_variants ORDER BY variant_id').fetchall()
+    return [dict(row, published=row['name'] == published) for row in rows]
+
+
+def publish(db, name):
+    db.execute("INSERT OR REPLACE INTO generation_settings (key, value) VALUES ('published_variant', ?)", (name,))
+
+
+def checkout(db, name, backup=None):
+    # Copies the variant into the working timetable_slots table that the editor and generator use,
+    # first saving the replaced table as the `backup` variant. Rows are read before the backup
+    # snapshot so checking out the backup itself swaps the two.
+    variant = get_variant(db, name)
+    if not variant:
+        return None
+    rows = db.execute('''
+        SELECT class_id, day, time_start, time_end, course_id, teacher_id, classroom_id, NULLIF(batch_number, 0)
+        FROM slot_pool WHERE row_id IN (SELECT value FROM json_each(?))
+    ''', (json.dumps(list(decode_row_ids(variant['row_ids']))),)).fetchall()
+    if backup:
+        snapshot(db, backup)
+    db.execute('DELETE FROM timetable_slots')
+    db.executemany(f"INSERT INTO timetable_slots ({', '.join(SLOT_COLUMNS)}) VALUES ({', '.join('?' * len(SLOT_COLUMNS))})",
+                   [tuple(row) for row in rows])
+    return len(rows)
+
+
+def delete_variant(db, name):
+    db.execute('DELETE FROM timetable_variants WHERE name = ?', (name,))
+    if get_published(db) == name:
+        publish(db, '')
+    prune_pool(db)
+
+
+def prune_pool(db):
+    # Drops pool rows that no variant references any more.
+    referenced = set()
+    for row in db.execute('SELECT row_ids FROM timetable_variants').fetchall():
+        referenced.update(decode_row_ids(row['row_ids']))
+    db.execute('DELETE FROM slot_pool WHERE row_id NOT IN (SELECT value FROM json_each(?))', (json.dumps(sorted(referenced)),))
+
+
+def variant_slots(db, row_ids, class_id=None):
+    sql = POOL_DETAILS_QUERY + ' WHERE p.row_id IN (SELECT value FROM json_each(?))'
+    params = [json.dumps(list(row_ids))]
+    if class_id is not None:
+        sql += ' AND p.class_id = ?'
+        params.append(class_id)
+    return db.execute(sql, params).fetchall()
+
+
+def diff(db, from_ids, to_ids):
+    # Set difference on pool ids: identical rows share an id, so only changed slots are touched.
+    before, after = set(from_ids), set(to_ids)
+    removed, added = before - after, after - before
+    slots = {row['slot_id']: dict(row) for row in variant_slots(db, removed | added)}
+
+    groups = {'classes': 'class_id', 'teachers': 'teacher_id', 'classrooms': 'classroom_id'}
+    result = {name: defaultdict(lambda: {'added': [], 'removed': []}) for name in groups}
+    for change, ids in (('added', added), ('removed', removed)):
+        for row_id in sorted(ids):
+            slot = slots.get(row_id)
+            if not slot:
+                continue
+            for name, column in groups.items():
+                result[name][slot[column]][change].append(row_id)
+
+    return {
+        'added': len(added),
+        'removed': len(removed),
+        'slots': slots,
+        **{name: dict(value) for name, value in result.items()},
+    }